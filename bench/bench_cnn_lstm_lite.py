@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model')
+sys.path.insert(0, MODEL_DIR)
+
+# Keras 模型与导出的 TFLite 模型对比：启动时间、内存、延迟、准确率。
+# 每种运行时在独立子进程中测量，互不影响内存统计。
+#   python bench_cnn_lstm_lite.py --acoustic acoustic_data.dataset --lite float.tflite int8.tflite
+
+
+def child(args):
+    import cnn_lstm_features as features
+
+    audio_samples, labels = features.load_data(args.acoustic)
+    audio_samples = np.asarray(audio_samples[:args.n_samples])
+    labels = np.asarray(labels[:args.n_samples])
+
+    start = time.perf_counter()
+    if args.child == 'keras':
+        from cnn_lstm_infer import InferenceSession
+        session = InferenceSession(args.model, args.scaler)
+    else:
+        from cnn_lstm_lite import LiteSession
+        session = LiteSession(args.child, args.lite_scaler)
+    startup = time.perf_counter() - start
+
+    session.predict_batch(audio_samples[:1])
+    start = time.perf_counter()
+    for sample in audio_samples[:args.latency_samples]:
+        session.predict_batch([sample])
+    latency = (time.perf_counter() - start) / min(args.latency_samples, len(audio_samples))
+
+    start = time.perf_counter()
+    preds = np.concatenate([session.predict_batch(audio_samples[i:i + args.batch_size])
+                            for i in range(0, len(audio_samples), args.batch_size)])
+    throughput = len(audio_samples) / (time.perf_counter() - start)
+
+    print(json.dumps({
+        'startup': startup,
+        'latency': latency,
+        'throughput': throughput,
+        'accuracy': float(np.mean(preds == labels)),
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'preds': preds.tolist(),
+    }))
+
+
+def main():
+    import cnn_lstm_features as features
+
+    parser = argparse.ArgumentParser(description="CNN-LSTM：Keras vs TFLite（浮点 / int8）")
+    parser.add_argument('--acoustic', default='acoustic_data.txt')
+    parser.add_argument('--model', default=features.MODEL_PATH)
+    parser.add_argument('--scaler', default=features.SCALER_PATH)
+    parser.add_argument('--lite', nargs='+', default=[features.LITE_MODEL_PATH], help="要对比的 .tflite 文件")
+    parser.add_argument('--lite-scaler', default=features.LITE_SCALER_PATH)
+    parser.add_argument('--n-samples', type=int, default=1000)
+    parser.add_argument('--latency-samples', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    results = {}
+    for runtime in ['keras'] + args.lite:
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', runtime] + sys.argv[1:]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=os.getcwd()).stdout
+        results[runtime] = json.loads(out.strip().splitlines()[-1])
+
+    reference = np.array(results['keras']['preds'])
+    print(f"{'运行时':<40} {'启动 s':>8} {'内存 MB':>9} {'单样本 ms':>10} {'样本/s':>9} {'准确率':>8} {'与 Keras 一致':>12}")
+    for runtime, r in results.items():
+        size = '' if runtime == 'keras' else f" ({os.path.getsize(runtime) / 2 ** 20:.1f} MB)"
+        agree = np.mean(np.array(r['preds']) == reference)
+        print(f"{os.path.basename(runtime) + size:<40} {r['startup']:>8.2f} {r['rss_mb']:>9.0f} "
+              f"{r['latency'] * 1e3:>10.2f} {r['throughput']:>9.1f} {r['accuracy']:>8.4f} {agree:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
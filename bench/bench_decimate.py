@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'gui'))
+from decimate import Pyramid, decimate
+
+
+def timed(func, repeat=5):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="绘图降采样：minmax / LTTB / 多分辨率金字塔")
+    parser.add_argument('--points', type=int, default=10_000_000, help="原始信号点数")
+    parser.add_argument('--fs', type=int, default=25600)
+    parser.add_argument('--out', type=int, default=2000, help="降采样后的点数上限")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t = np.arange(args.points) / args.fs
+    signal = np.sin(2 * np.pi * 50 * t) + 0.1 * rng.standard_normal(args.points)
+    spike = args.points * 2 // 3
+    signal[spike] += 20  # 单点冲击，降采样后必须保留
+
+    print(f"原始 {args.points} 点，输出上限 {args.out} 点")
+    for method in ('minmax', 'lttb'):
+        elapsed, (x, y) = timed(lambda: decimate(t, signal, args.out, method))
+        print(f"{method:>6}: {elapsed * 1e3:8.2f} ms，{len(x)} 点，冲击保留: {y.max() == signal.max()}")
+
+    start = time.perf_counter()
+    pyramid = Pyramid(t, signal)
+    print(f"金字塔构建: {(time.perf_counter() - start) * 1e3:.2f} ms，{len(pyramid.levels)} 级，"
+          f"{pyramid.nbytes / 2 ** 20:.1f} MiB")
+
+    duration = t[-1]
+    for fraction in (1.0, 0.1, 0.01, 0.001):
+        x0 = t[spike] - duration * fraction / 2
+        x1 = x0 + duration * fraction
+        scan, _ = timed(lambda: decimate(*(a[(t >= x0) & (t <= x1)] for a in (t, signal)), args.out))
+        query, (x, y) = timed(lambda: pyramid.query(x0, x1, args.out))
+        print(f"缩放到 {fraction:6.1%}: 直接扫描 {scan * 1e3:8.2f} ms，金字塔 {query * 1e3:6.2f} ms，"
+              f"{len(x)} 点，冲击保留: {y.max() == signal.max()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+import cnn_lstm_features as features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="梅尔频谱提取：逐样本 librosa vs 批量")
+    parser.add_argument('--n-samples', type=int, default=2000)
+    parser.add_argument('--n-points', type=int, default=16000)
+    parser.add_argument('--loop-samples', type=int, default=200, help="逐样本版本只跑前若干个样本，再按比例折算")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t = np.arange(args.n_points) / features.ACOUSTIC_PARAMS['sr']
+    data = np.sin(2 * np.pi * 440 * t) + 0.5 * rng.standard_normal((args.n_samples, args.n_points))
+    n_loop = min(args.loop_samples, args.n_samples)
+
+    for dtype in (np.float64, np.float32):
+        samples = data.astype(dtype)
+        features.extract_acoustic_features(samples[0])  # 预热 librosa
+        start = time.perf_counter()
+        ref = np.array([features.extract_acoustic_features(x) for x in samples[:n_loop]])
+        loop_time = (time.perf_counter() - start) * args.n_samples / n_loop
+
+        features.extract_acoustic_features_batch(samples[:1], dtype=dtype)  # 预先构建滤波器组
+        start = time.perf_counter()
+        batch = features.extract_acoustic_features_batch(samples, dtype=dtype)
+        batch_time = time.perf_counter() - start
+
+        err = np.max(np.abs(batch[:n_loop] - ref))
+        print(f"{np.dtype(dtype).name}: 样本数 {args.n_samples}, 点数 {args.n_points}, 结果 {batch.nbytes / 2 ** 20:.1f} MB")
+        print(f"  逐样本: {loop_time:.2f} s（由 {n_loop} 个样本折算）")
+        print(f"  批量:   {batch_time:.2f} s，加速 {loop_time / batch_time:.1f}x")
+        print(f"  最大绝对误差: {err:.3e}")
+
+
+if __name__ == "__main__":
+    main()
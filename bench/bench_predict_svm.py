@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+import svm
+
+
+def timeit(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVM 预测延迟与吞吐：每次加载 vs 常驻注册表 vs 批量")
+    parser.add_argument('--n-train', type=int, default=5000)
+    parser.add_argument('--n-features', type=int, default=24)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((args.n_train, args.n_features))
+    y = (X[:, 0] + 0.5 * rng.standard_normal(args.n_train) > 0).astype(float)
+    queries = rng.standard_normal((args.batch, args.n_features))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_name = os.path.join(tmp, 'bench_svm.pkl')
+        svm.train_svm(X, y, model_name)
+
+        def reload_each_call():
+            model, scaler = joblib.load(model_name)
+            return model.predict(scaler.transform([queries[0]]))[0]
+
+        svm.predict_svm(queries[0], model_name)  # 预热注册表
+        t_reload = timeit(reload_each_call, args.repeat)
+        t_single = timeit(lambda: svm.predict_svm(queries[0], model_name), args.repeat)
+        t_loop = timeit(lambda: [svm.predict_svm(q, model_name) for q in queries], max(1, args.repeat // 10))
+        t_batch = timeit(lambda: svm.predict_many(queries, model_name), max(1, args.repeat // 10))
+
+        assert np.array_equal(svm.predict_many(queries, model_name),
+                              [svm.predict_svm(q, model_name) for q in queries])
+
+    print(f"训练样本: {args.n_train}, 特征维数: {args.n_features}, 批大小: {args.batch}")
+    print(f"每次 joblib.load:   {t_reload * 1e3:8.3f} ms/次")
+    print(f"常驻注册表单样本: {t_single * 1e3:8.3f} ms/次")
+    print(f"逐样本循环:       {args.batch / t_loop:10.0f} 样本/s")
+    print(f"predict_many 批量: {args.batch / t_batch:10.0f} 样本/s（{t_batch * 1e3:.2f} ms/批）")
+
+
+if __name__ == "__main__":
+    main()
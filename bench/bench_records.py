@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+from records import RecordStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="诊断记录库：批量写入与键集分页 vs OFFSET 分页")
+    parser.add_argument('--records', type=int, default=1_000_000)
+    parser.add_argument('--pumps', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=50000)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordStore(os.path.join(tmp, 'records.db'))
+        start = time.perf_counter()
+        for offset in range(0, args.records, args.batch):
+            n = min(args.batch, args.records - offset)
+            store.add_many(dict(pump=f"P{i % args.pumps:02d}", verdict=int(rng.integers(4)), ts=1.7e9 + i,
+                                features=rng.standard_normal(24)) for i in range(offset, offset + n))
+        elapsed = time.perf_counter() - start
+        print(f"批量写入 {args.records} 条: {elapsed:.2f} s（{args.records / elapsed:.0f} 条/s）")
+
+        pump = "P03"
+        total = args.records // args.pumps
+        conn = store._connect()
+        for depth in (0, total // 10, total // 2, total - args.page_size):
+            # 键集分页：先定位到该深度的游标（只为测试），再计时取下一页
+            row = conn.execute("SELECT ts, id FROM records WHERE pump = ? ORDER BY ts DESC, id DESC LIMIT 1 OFFSET ?",
+                               (pump, max(0, depth - 1))).fetchone()
+            cursor = tuple(row) if depth else None
+            start = time.perf_counter()
+            for _ in range(20):
+                store.page(pump=pump, cursor=cursor, limit=args.page_size)
+            keyset = (time.perf_counter() - start) / 20
+
+            start = time.perf_counter()
+            for _ in range(20):
+                conn.execute("SELECT id, pump, ts, verdict FROM records WHERE pump = ? ORDER BY ts DESC, id DESC "
+                             "LIMIT ? OFFSET ?", (pump, args.page_size, depth)).fetchall()
+            offset = (time.perf_counter() - start) / 20
+            print(f"第 {depth // args.page_size:6d} 页: 键集分页 {keyset * 1e3:7.3f} ms，OFFSET {offset * 1e3:7.3f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
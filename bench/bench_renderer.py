@@ -0,0 +1,73 @@
+import os
+import sys
+import io
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'gui'))
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from renderer import FigureRenderer
+
+
+def rss_mb():
+    """ 当前常驻内存（MB） """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def render_subplots(x, y, close):
+    """ 原做法：每次刷新新建图形，close=False 时与原先一样不关闭 """
+    fig, ax = plt.subplots(figsize=(6, 3), dpi=100)
+    ax.plot(x, y)
+    ax.set_title("时域分析")
+    ax.set_xlabel("时间 (s)")
+    ax.set_ylabel("信号幅度")
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png')
+    if close:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def soak(name, render, refreshes, report):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 1, 2000)
+    base = rss_mb()
+    start = time.perf_counter()
+    for i in range(1, refreshes + 1):
+        render(x, np.sin(2 * np.pi * 50 * x) + 0.1 * rng.standard_normal(len(x)), i)
+        if i % report == 0:
+            print(f"  {name} 第 {i:5d} 次: 内存 +{rss_mb() - base:7.1f} MB")
+    elapsed = (time.perf_counter() - start) / refreshes
+    print(f"{name}: {elapsed * 1e3:.2f} ms/次，内存增长 {rss_mb() - base:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图形渲染浸泡测试：每次新建图形 vs 常驻图形复用")
+    parser.add_argument('--refreshes', type=int, default=3000)
+    parser.add_argument('--sessions', type=int, default=8, help="轮流刷新的会话数")
+    parser.add_argument('--leak-refreshes', type=int, default=300, help="不关闭图形的原做法刷新次数（增长很快）")
+    args = parser.parse_args()
+    report = max(1, args.refreshes // 6)
+
+    soak("plt.subplots 不关闭", lambda x, y, i: render_subplots(x, y, close=False),
+         args.leak_refreshes, max(1, args.leak_refreshes // 3))
+    plt.close('all')
+    soak("plt.subplots + close", lambda x, y, i: render_subplots(x, y, close=True), args.refreshes, report)
+
+    renderer = FigureRenderer(max_figures=args.sessions * 2)
+    soak("常驻图形复用", lambda x, y, i: renderer.render_line(
+        i % args.sessions, 'time', x, y, title="时域分析", xlabel="时间 (s)", ylabel="信号幅度"),
+         args.refreshes, report)
+    print(f"常驻图形 {len(renderer)} 个，累计创建 {renderer.created} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+from spectrum import IncrementalSpectrum
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实时频谱更新：每次整段 FFT vs 增量帧频谱")
+    parser.add_argument('--fs', type=int, default=25600)
+    parser.add_argument('--view-seconds', type=float, default=10.0, help="频谱覆盖的时长")
+    parser.add_argument('--chunk', type=int, default=1024, help="每次刷新新到达的点数")
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--frame', type=int, default=8192)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    view = int(args.fs * args.view_seconds)
+    n = view + args.chunk * args.updates
+    t = np.arange(n) / args.fs
+    signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t) + 0.1 * rng.standard_normal(n)
+
+    # 原做法：每次刷新对最近 view 个点做完整 FFT
+    start = time.perf_counter()
+    for i in range(args.updates):
+        end = view + i * args.chunk
+        np.abs(np.fft.fft(signal[end - view:end]))
+    full_time = (time.perf_counter() - start) / args.updates
+
+    hop = args.frame // 2
+    engine = IncrementalSpectrum(args.fs, frame_size=args.frame, hop=hop, n_frames=max(1, (view - args.frame) // hop + 1))
+    engine.push(signal[:view])
+    start = time.perf_counter()
+    for i in range(args.updates):
+        end = view + i * args.chunk
+        engine.push(signal[end - args.chunk:end])
+        engine.magnitude()
+    inc_time = (time.perf_counter() - start) / args.updates
+
+    peak = engine.freqs[np.argmax(engine.magnitude())]
+    print(f"窗口 {view} 点 ({args.view_seconds:.0f} s @ {args.fs} Hz)，每次新增 {args.chunk} 点，帧长 {args.frame}")
+    print(f"完整 FFT: {full_time * 1e3:8.3f} ms/次")
+    print(f"增量频谱: {inc_time * 1e3:8.3f} ms/次，加速 {full_time / inc_time:.1f}x")
+    print(f"增量频谱主峰频率: {peak:.1f} Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+from sklearn.datasets import make_classification
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+import svm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVM 引擎对比：精确 SVC vs Nystroem / 随机傅里叶特征")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 8000, 32000, 128000])
+    parser.add_argument('--exact-max', type=int, default=32000, help="超过该样本数不再训练精确 SVC（太慢）")
+    parser.add_argument('--features', type=int, default=24, help="特征维数（振动特征为 24）")
+    parser.add_argument('--classes', type=int, default=4)
+    parser.add_argument('--components', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'样本数':>8} {'引擎':>9} {'训练 s':>9} {'预测 ms/千条':>12} {'准确率':>8}")
+    for n in args.sizes:
+        X, y = make_classification(n_samples=n, n_features=args.features, n_informative=12,
+                                   n_classes=args.classes, n_clusters_per_class=2, random_state=0)
+        X = StandardScaler().fit_transform(X)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        for engine in ('exact', 'nystroem', 'rff'):
+            if engine == 'exact' and n > args.exact_max:
+                print(f"{n:>8} {engine:>9} {'跳过':>9}")
+                continue
+            model = svm.make_svm(engine, X_train, n_components=args.components)
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_time = time.perf_counter() - start
+            start = time.perf_counter()
+            acc = np.mean(model.predict(X_test) == y_test)
+            predict_time = (time.perf_counter() - start) / len(X_test) * 1000
+            print(f"{n:>8} {engine:>9} {fit_time:>9.2f} {predict_time * 1e3:>12.2f} {acc:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
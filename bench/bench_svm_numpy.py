@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+import subprocess
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model')
+sys.path.insert(0, MODEL_DIR)
+import svm
+import svm_numpy
+
+# 冷启动：新进程导入预测模块、加载模型并预测一个样本的耗时
+COLD_START = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {model_dir!r})
+import {module} as m
+m.predict_svm([0.0] * {n_features}, {model_name!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(module, model_name, n_features):
+    code = COLD_START.format(model_dir=MODEL_DIR, module=module, model_name=model_name, n_features=n_features)
+    return float(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVM 预测：sklearn SVC vs 导出的纯 NumPy 模型")
+    parser.add_argument('--n-train', type=int, default=5000)
+    parser.add_argument('--n-features', type=int, default=24)
+    parser.add_argument('--classes', type=int, default=4)
+    parser.add_argument('--batch', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.classes, args.n_features))
+    y = rng.integers(args.classes, size=args.n_train + args.batch).astype(float)
+    X = centers[y.astype(int)] + 1.5 * rng.standard_normal((len(y), args.n_features))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_name = os.path.join(tmp, 'svm.pkl')
+        svm.train_svm(X[:args.n_train], y[:args.n_train], model_name)
+        npz_name = svm.export_numpy(model_name)
+        queries = X[args.n_train:]
+
+        results = {}
+        for module, name in ((svm, model_name), (svm_numpy, npz_name)):
+            module.predict_many(queries[:10], name)  # 预热注册表
+            start = time.perf_counter()
+            preds = module.predict_many(queries, name)
+            results[module.__name__] = (time.perf_counter() - start, preds)
+
+        agree = np.mean(results['svm'][1] == results['svm_numpy'][1])
+        print(f"模型文件: .pkl {os.path.getsize(model_name) / 1024:.0f} KB, .npz {os.path.getsize(npz_name) / 1024:.0f} KB")
+        for module, name in (('svm', model_name), ('svm_numpy', npz_name)):
+            elapsed = results[module][0]
+            print(f"{module:>10}: 冷启动 {cold_start(module, name, args.n_features):.2f} s，"
+                  f"批量 {args.batch / elapsed:10.0f} 样本/s")
+        print(f"预测一致率: {agree:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+import svm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="振动特征提取：逐样本 vs 批量")
+    parser.add_argument('--n-samples', type=int, default=10000)
+    parser.add_argument('--n-points', type=int, default=1024)
+    parser.add_argument('--loop-samples', type=int, default=1000, help="逐样本版本只跑前若干个样本，再按比例折算")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t = np.arange(args.n_points) / 1000
+    data = np.sin(2 * np.pi * 50 * t) + 0.5 * rng.standard_normal((args.n_samples, args.n_points))
+
+    n_loop = min(args.loop_samples, args.n_samples)
+    start = time.perf_counter()
+    ref = np.array([svm.extract_vibration_features(x) for x in data[:n_loop]])
+    loop_time = (time.perf_counter() - start) * args.n_samples / n_loop
+
+    svm.extract_vibration_features_batch(data[:8])  # 预先构建小波权重
+    start = time.perf_counter()
+    batch = svm.extract_vibration_features_batch(data)
+    batch_time = time.perf_counter() - start
+
+    err = np.max(np.abs(batch[:n_loop] - ref))
+    print(f"样本数: {args.n_samples}, 点数: {args.n_points}")
+    print(f"逐样本: {loop_time:.2f} s（由 {n_loop} 个样本折算）")
+    print(f"批量:   {batch_time:.2f} s，加速 {loop_time / batch_time:.1f}x")
+    print(f"最大绝对误差: {err:.3e}")
+
+
+if __name__ == "__main__":
+    main()
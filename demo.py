@@ -1,84 +1,65 @@
+import os
+import sys
+import time
 import remi.gui as gui
 from remi import start, App
 import numpy as np
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
-import scipy.fftpack as fft
-
-# 解决 Matplotlib 中文显示问题
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-
-def generate_placeholder_image():
-    """ 生成默认的占位图，显示‘等待数据传入’ """
-    fig, ax = plt.subplots(figsize=(6, 3),dpi=100)
-    ax.text(0.5, 0.5, "等待数据传入", fontsize=15, ha='center', va='center')
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
-    ax.spines['bottom'].set_visible(False)
-    
-    return fig_to_base64(fig)
-
-def generate_signal():
-    """ 生成模拟离心泵故障信号（50Hz + 120Hz 叠加信号） """
-    fs = 1000  # 采样频率
-    t = np.linspace(0, 1, fs)  # 时间向量
-    signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
-    return t, signal
-
-
-def fig_to_base64(fig):
-    """ 将 matplotlib 图表转换为 base64 字符串用于前端显示 """
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    return "data:image/png;base64," + base64.b64encode(buf.read()).decode("utf-8")
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui'))
+from spectrum import IncrementalSpectrum
+from streaming import replay_source
+from plot_widget import CanvasPlot
+from decimate import Pyramid, decimate
+from renderer import renderer
+from jobs import JobManager
+from upload import StreamingFileUploader
+from utils import load_recording, UPLOAD_DIR
 
 class PumpFaultDetectionApp(App):
     def __init__(self, *args):
         super(PumpFaultDetectionApp, self).__init__(*args)
         self.data = None
+        self.pyramid = None  # 时域信号的多分辨率包络，缩放查看时不必重新扫描整段数据
+        self.jobs = JobManager(self)
+        # 增量频谱：新数据到达时只对新凑满的帧做 FFT
+        self.spectrum = IncrementalSpectrum(fs=1000, frame_size=256, n_frames=8)
 
     def main(self):
-        # 生成默认的 "等待数据传入" 图片
-        placeholder_img = generate_placeholder_image()
-
         # 主容器（垂直布局，填满屏幕）
         container = gui.VBox(width="100%", height="100%", margin="10px")
 
         # 上传文件按钮
-        self.upload_btn = gui.FileUploader(width="100%", height="auto")
+        self.upload_btn = StreamingFileUploader(UPLOAD_DIR, width="100%", height="auto")
         self.upload_btn.onsuccess.do(self.on_file_upload)
 
         # 时域图 & 频域图（并排布局）
         canvas_container = gui.HBox(width="100%", height="60%")
         
-        # 时域图部分
+        # 时域图部分（浏览器端绘制，未传入数据时显示“等待数据传入”）
         time_domain_canvas_container = gui.VBox(width="40%", height="100%")
-        self.time_domain_canvas = gui.Image(placeholder_img,width="100%", height="90%")
+        self.time_domain_canvas = CanvasPlot(self, width="100%", height="90%")
         time_domain_canvas_container.append(gui.Label("时域分析", style={"font-size": "20px", "text-align": "center"}))
         time_domain_canvas_container.append(self.time_domain_canvas)
 
         # 频域图部分
         freq_domain_canvas_container = gui.VBox(width="40%", height="100%")
-        self.freq_domain_canvas = gui.Image(placeholder_img,width="100%", height="90%")
+        self.freq_domain_canvas = CanvasPlot(self, width="100%", height="90%")
         freq_domain_canvas_container.append(gui.Label("频域分析", style={"font-size": "20px", "text-align": "center"}))
         freq_domain_canvas_container.append(self.freq_domain_canvas)
 
         canvas_container.append(time_domain_canvas_container)
         canvas_container.append(freq_domain_canvas_container)
 
-        # 按钮容器（放置 "故障检测" & "保存数据"）
+        # 按钮容器（放置 "实时回放" & "故障检测" & "保存数据"）
         button_container = gui.HBox(width="100%", height="auto", margin="10px")
-        self.detection_btn = gui.Button("进行故障检测", width="40%", height="50px")
-        self.save_btn = gui.Button("保存分析结果", width="40%", height="50px")
+        self.replay_btn = gui.Button("实时回放", width="30%", height="50px")
+        self.detection_btn = gui.Button("进行故障检测", width="30%", height="50px")
+        self.save_btn = gui.Button("保存分析结果", width="30%", height="50px")
+        self.replay_btn.onclick.do(self.on_replay)
         self.detection_btn.onclick.do(self.on_fault_detection)
         self.save_btn.onclick.do(self.on_save)
+        button_container.append(self.replay_btn)
         button_container.append(self.detection_btn)
         button_container.append(self.save_btn)
 
@@ -90,43 +71,79 @@ class PumpFaultDetectionApp(App):
         return container
 
     def on_file_upload(self, widget, filename):
-        """ 文件上传回调函数，加载数据 """
-        # 这里可以替换为从上传文件中读取数据
-        t, signal = generate_signal()
-        self.data = (t, signal)
-        self.update_time_domain_plot(t, signal)
-        self.update_freq_domain_plot(t, signal)
-
-    def update_time_domain_plot(self, t, signal):
-        """ 绘制时域信号波形 """
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.plot(t, signal)
-        ax.set_title("时域分析")
-        ax.set_xlabel("时间 (s)")
-        ax.set_ylabel("信号幅度")
-        ax.grid()
-        self.time_domain_canvas.set_image(fig_to_base64(fig))
-
-    def update_freq_domain_plot(self, t, signal):
-        """ 绘制频域信号波形（FFT 变换） """
-        fs = 1000  # 采样频率
-        n = len(signal)
-        freq = np.fft.fftfreq(n, 1/fs)
-        fft_signal = np.abs(fft.fft(signal))
-
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.plot(freq[:n//2], fft_signal[:n//2])  # 只绘制正频率部分
-        ax.set_title("频域分析")
-        ax.set_xlabel("频率 (Hz)")
-        ax.set_ylabel("幅度")
-        ax.grid()
-        self.freq_domain_canvas.set_image(fig_to_base64(fig))
+        """ 文件上传回调函数，在后台识别格式并以内存映射方式加载数据 """
+        self.time_domain_canvas.show_message("正在加载数据...")
+        self.jobs.submit('load', self.load_job, filename, on_done=self.on_data_loaded,
+                         on_error=lambda e: self.time_domain_canvas.show_message(f"加载失败: {e}"))
+
+    def load_job(self, job, filename):
+        recording = load_recording(filename)
+        signal = recording.samples[0]  # 内存映射，不复制整段数据
+        job.check()
+        pyramid = Pyramid(None, signal, fs=recording.fs)
+        job.check()
+        spectrum = IncrementalSpectrum(fs=recording.fs, frame_size=256, n_frames=8)
+        spectrum.push(signal[-spectrum.span:])  # 平均谱只取决于最后若干帧
+        return recording, pyramid, spectrum
+
+    def on_data_loaded(self, result):
+        self.jobs.cancel('replay')  # 正在回放的是旧录音
+        recording, self.pyramid, self.spectrum = result
+        self.data = recording
+        self.update_time_domain_plot()
+        self.update_freq_domain_plot()
+
+    def on_replay(self, widget):
+        """ 按实际采样率回放已加载的录音，模拟实时传感器，频谱随数据到达增量刷新 """
+        if self.data is None:
+            return
+        self.spectrum.reset()
+        self.jobs.submit('replay', self.replay_job, self.data.samples[0], self.data.fs)
+
+    def replay_job(self, job, signal, fs, chunk_size=256):
+        for chunk in replay_source(signal, chunk_size, fs=fs):
+            with self.update_lock:
+                job.check()  # 在锁内检查，取消后不会再推入旧数据
+                self.on_new_samples(chunk)
+
+    def on_new_samples(self, samples):
+        """ 实时数据到达：频谱只在凑满新帧时才重新计算和刷新 """
+        if self.spectrum.push(samples):
+            self.update_freq_domain_plot()
+
+    def update_time_domain_plot(self, t0=None, t1=None):
+        """ 绘制时域信号波形，t0、t1 为显示的时间范围（默认全部），按像素宽度降采样并保留峰值 """
+        t, signal = self.pyramid.query(t0, t1)
+        self.time_domain_canvas.plot_line(t, signal, title="时域分析", xlabel="时间 (s)", ylabel="信号幅度")
+
+    def update_freq_domain_plot(self):
+        """ 绘制频域信号波形（最近若干帧的平均幅度谱，只含正频率） """
+        freqs, magnitude = decimate(self.spectrum.freqs, self.spectrum.magnitude(), method='lttb')
+        self.freq_domain_canvas.plot_line(freqs, magnitude, title="频域分析", xlabel="频率 (Hz)", ylabel="幅度")
 
     def on_fault_detection(self, widget):
         """ 检测故障 """
 
     def on_save(self, widget):
-        """ 数据保存操作 """
+        """ 数据保存操作：把当前时域图和频域图导出为 PNG（复用本会话的常驻图形） """
+        if self.pyramid is None:
+            return
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        t, signal = self.pyramid.query()
+        freqs, magnitude = decimate(self.spectrum.freqs, self.spectrum.magnitude(), method='lttb')
+        plots = [
+            ('time', t, signal, "时域分析", "时间 (s)", "信号幅度"),
+            ('freq', freqs, magnitude, "频域分析", "频率 (Hz)", "幅度"),
+        ]
+        for slot, x, y, title, xlabel, ylabel in plots:
+            filename = f"analysis_{stamp}_{slot}.png"
+            with open(filename, 'wb') as f:
+                f.write(renderer.render_line(id(self), slot, x, y, title=title, xlabel=xlabel, ylabel=ylabel))
+            print(f"已保存 {filename}")
+
+    def on_close(self):
+        renderer.release(id(self))
+        super(PumpFaultDetectionApp, self).on_close()
 
 
 # 运行应用
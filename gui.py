@@ -1,32 +1,20 @@
+import os
+import sys
 import remi.gui as gui
 from remi import start, App
 import numpy as np
-import matplotlib.pyplot as plt
-import pywt
-from io import BytesIO
-import base64
 
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 处理中文字体
-plt.rcParams['axes.unicode_minus'] = False  # 处理负号问题
-
-def generate_placeholder_image():
-    """ 生成默认占位图 """
-    fig, ax = plt.subplots(figsize=(6, 3), dpi=100)
-    ax.text(0.5, 0.5, "等待数据传入", fontsize=15, ha='center', va='center')
-    ax.axis("off")
-    return fig_to_base64(fig)
-
-def fig_to_base64(fig):
-    """ 将 matplotlib 图表转换为 base64 字符串 """
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    return "data:image/png;base64," + base64.b64encode(buf.read()).decode("utf-8")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui'))
+from plot_widget import CanvasPlot
+from jobs import JobManager
+from upload import StreamingFileUploader
+from utils import compute_cwt, load_recording, recording_segment, UPLOAD_DIR
 
 class PumpFaultDetectionApp(App):
     def main(self):
-        self.data = None
-        self.placeholder_img = generate_placeholder_image()
+        self.data = None  # 上传的录音（ingest.Recording），未上传时使用模拟信号
+        self.jobs = JobManager(self)  # 本会话的后台任务
 
         # 主容器
         self.container = gui.VBox(width="100%", height="100%", margin="10px")
@@ -50,13 +38,14 @@ class PumpFaultDetectionApp(App):
         self.info_label = gui.Label("欢迎使用离心泵故障诊断系统", width="100%", height="50px", style={"text-align": "center", "font-size": "20px"})
         
         # 第三排：文件上传按钮
-        self.file_uploader = gui.FileUploader(width="100%", height="auto")
+        self.file_uploader = StreamingFileUploader(UPLOAD_DIR, width="100%", height="auto")
         self.file_uploader.onsuccess.do(self.on_file_upload)
         
         # 分析界面（默认隐藏）
         self.analysis_container = gui.VBox(width="100%", height="60%", style={"display": "none"})
-        self.time_domain_canvas = gui.Image(self.placeholder_img, width="100%", height="90%")
-        self.freq_domain_canvas = gui.Image(self.placeholder_img, width="100%", height="90%")
+        # 浏览器端绘制，未传入数据时显示“等待数据传入”
+        self.time_domain_canvas = CanvasPlot(self, width="100%", height="90%")
+        self.freq_domain_canvas = CanvasPlot(self, width="100%", height="90%")
         self.start_analysis_btn = gui.Button("开始分析", width="30%", height="50px")
         self.start_analysis_btn.onclick.do(self.perform_analysis)
         
@@ -74,6 +63,7 @@ class PumpFaultDetectionApp(App):
         return self.container
 
     def show_main_view(self, widget=None):
+        self.jobs.cancel_all(keep=('load',))
         self.info_label.set_text("欢迎使用离心泵故障诊断系统")
         self.analysis_container.style["display"] = "none"
 
@@ -82,26 +72,49 @@ class PumpFaultDetectionApp(App):
         self.info_label.set_text("请点击‘开始分析’以查看结果")
 
     def on_file_upload(self, widget, filename):
-        self.info_label.set_text(f"已选择文件: {filename}")
+        # 文本数据需要先转换为二进制，放在后台进行
+        self.info_label.set_text(f"正在加载文件: {os.path.basename(filename)}")
+        self.jobs.submit('load', lambda job: load_recording(filename), on_done=self.on_file_loaded,
+                         on_error=self.on_job_error)
 
-    def perform_analysis(self, widget):
-        # 生成信号数据
+    def on_file_loaded(self, recording):
+        self.data = recording
+        self.info_label.set_text(f"已选择文件: {os.path.basename(recording.path)}"
+                                 f"（{recording.format}，{recording.samples.shape[0]} × {recording.samples.shape[1]}）")
+
+    def current_signal(self):
+        """ 当前分析的信号：上传的录音的第一段，没有上传时为模拟信号 """
+        if self.data is not None:
+            return recording_segment(self.data)
         fs = 1000  # 采样率
         t = np.linspace(0, 1, fs)
-        signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
-        
-        # 计算 CWT 变换
-        scales = np.arange(1, 128)
-        coefficients, frequencies = pywt.cwt(signal, scales, 'cmor', sampling_period=1/fs)
-        
-        # 绘制时频图
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.imshow(np.abs(coefficients), aspect='auto', extent=[0, 1, 1, 128], cmap='jet')
-        ax.set_title("时频分析（CWT）")
-        ax.set_xlabel("时间 (s)")
-        ax.set_ylabel("尺度")
+        return np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t), fs
+
+    def perform_analysis(self, widget):
+        # 计算交给后台任务，事件回调立即返回
+        self.info_label.set_text("正在分析...")
+        self.jobs.submit('analysis', self.analysis_job, on_progress=self.on_job_progress,
+                         on_done=self.on_analysis_done, on_error=self.on_job_error)
+
+    def analysis_job(self, job):
+        signal, fs = self.current_signal()
         
-        self.time_domain_canvas.set_image(fig_to_base64(fig))
+        # 计算 CWT 变换（分段计算并报告进度）
+        coefficients, frequencies = compute_cwt(signal, fs, 'cmor', job=job)
+        return np.abs(coefficients), len(signal) / fs
+
+    def on_analysis_done(self, result):
+        magnitude, duration = result
+        # 绘制时频图（量化为 uint8 发送到浏览器绘制）
+        self.time_domain_canvas.plot_heatmap(magnitude, extent=[0, duration, 1, 128],
+                                             title="时频分析（CWT）", xlabel="时间 (s)", ylabel="尺度")
+        self.info_label.set_text("分析完成")
+
+    def on_job_progress(self, fraction, message):
+        self.info_label.set_text(f"{message} {fraction:.0%}")
+
+    def on_job_error(self, error):
+        self.info_label.set_text(f"计算失败: {error}")
 
 # 运行应用
 start(PumpFaultDetectionApp, address='0.0.0.0', port=8081, start_browser=True)
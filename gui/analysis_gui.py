@@ -1,7 +1,19 @@
+from urllib.parse import quote
 import remi.gui as gui
+import utils
+
+# 时频图计算完成前显示的占位图（内联 SVG，不需要渲染）
+PLACEHOLDER_IMAGE = "data:image/svg+xml;charset=utf-8," + quote(
+    '<svg xmlns="http://www.w3.org/2000/svg" width="600" height="300">'
+    '<rect width="100%" height="100%" fill="#e9ecef"/>'
+    '<text x="50%" y="50%" text-anchor="middle" font-size="20" fill="#888">时频图计算中</text></svg>')
 
 def get_analysis_ui(main_app):
     """ 创建时频域分析界面 """
+    def on_back(widget):
+        main_app.jobs.cancel('analysis')  # 返回主界面时不再需要时频图
+        main_app.show_main_ui()
+
     container = gui.VBox(width="100%", height="100%")
     container.style['background-color'] = '#f4f4f9'
 
@@ -11,11 +23,30 @@ def get_analysis_ui(main_app):
     back_button.style['border'] = 'none'
     back_button.style['border-radius'] = '5px'
     back_button.style['margin'] = '20px'
-    back_button.onclick.do(lambda _: main_app.show_main_ui())  # 使用lambda确保正确绑定
+    back_button.onclick.do(on_back)
 
     label = gui.Label("时频域分析界面", style={"font-size": "24px", "text-align": "center", "color": "#333"})
 
+    status_label = gui.Label("正在计算时频图...", style={"font-size": "16px", "text-align": "center", "color": "#666"})
+
+    # 先显示占位图，小波变换和渲染在后台任务中进行，完成后替换；离开本界面时任务被取消
+    # 同一信号、同一参数的时频图已缓存，重复打开本界面时不再重新计算和渲染
+    cwt_image = gui.Image(PLACEHOLDER_IMAGE, width="80%", height="auto")
+    cwt_image.style['margin'] = '0 auto'
+
+    def on_done(image):
+        cwt_image.set_image(image)
+        status_label.set_text("")
+
+    signal, fs = main_app.current_signal()
+    main_app.jobs.submit('analysis', lambda job: utils.generate_cwt_image(signal, fs, session=id(main_app), job=job),
+                         on_progress=lambda fraction, message: status_label.set_text(f"{message} {fraction:.0%}"),
+                         on_done=on_done,
+                         on_error=lambda e: status_label.set_text(f"计算失败: {e}"))
+
     container.append(back_button)
     container.append(label)
+    container.append(status_label)
+    container.append(cwt_image)
 
     return container
@@ -0,0 +1,175 @@
+import numpy as np
+
+# 绘图降采样：把任意长的序列压缩到与屏幕像素宽度相当的点数。
+#   minmax: 每个区间保留最小值和最大值（按时间顺序），冲击、峰值不会丢失
+#   lttb:   Largest-Triangle-Three-Buckets，保留曲线形状，每个区间只取一个点
+# Pyramid 预先计算多级最小/最大值包络，放大查看某一段时不必重新扫描整段数据。
+
+DEFAULT_POINTS = 2000  # 约为常见绘图区域像素宽度的两倍
+
+
+def _pad_reshape(a, group):
+    """ 末尾用最后一个元素补齐到 group 的整数倍后变形为 (-1, group) """
+    pad = -len(a) % group
+    if pad:
+        a = np.concatenate([a, np.repeat(a[-1:], pad)])
+    return a.reshape(-1, group)
+
+
+def _merge(min_val, min_idx, max_val, max_idx, group):
+    """ 每 group 个相邻区间合并为一个，返回合并后区间的 (最小值, 下标, 最大值, 下标) """
+    rows = np.arange(-(-len(min_val) // group))[:, None]
+    lo = _pad_reshape(min_val, group).argmin(axis=1)[:, None] + rows * group
+    hi = _pad_reshape(max_val, group).argmax(axis=1)[:, None] + rows * group
+    lo = np.minimum(lo.ravel(), len(min_val) - 1)
+    hi = np.minimum(hi.ravel(), len(max_val) - 1)
+    return min_val[lo], min_idx[lo], max_val[hi], max_idx[hi]
+
+
+def _envelope(y, size, offset=0):
+    """ 原始数据按 size 个点分段的最小/最大值及其（加上 offset 后的）下标 """
+    blocks = _pad_reshape(y, size)
+    starts = np.arange(len(blocks)) * size
+    lo = np.minimum(blocks.argmin(axis=1) + starts, len(y) - 1)
+    hi = np.minimum(blocks.argmax(axis=1) + starts, len(y) - 1)
+    return y[lo], lo + offset, y[hi], hi + offset
+
+
+def _minmax_indices(min_idx, max_idx):
+    """ 每个区间的两个下标按时间顺序排列，去掉重复 """
+    return np.unique(np.concatenate([min_idx, max_idx]))
+
+
+def minmax(x, y, n_out=DEFAULT_POINTS):
+    """ 最小/最大值包络降采样，返回不超过 n_out 个点的 (x, y) """
+    y = np.asarray(y)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    if len(y) <= n_out:
+        return x, y
+    _, lo, _, hi = _envelope(y, -(-len(y) // max(1, n_out // 2)))
+    idx = _minmax_indices(lo, hi)
+    return x[idx], y[idx]
+
+
+def lttb(x, y, n_out=DEFAULT_POINTS):
+    """ LTTB 降采样，首尾两点保留，其余每个区间选取与前一选中点、下一区间均值构成最大三角形的点 """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # 中间 n_out - 2 个区间的边界
+    # 各区间的均值（下一区间均值是选点时的第三个顶点），最后一个“区间”为末点
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[i + 1] - ay))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+def decimate(x, y, n_out=DEFAULT_POINTS, method='minmax'):
+    """
+    降采样到不超过 n_out 个点。
+
+    lttb 先用 minmax 预压缩到 4 * n_out 个点再选点，耗时与原始长度基本无关。
+    """
+    if method == 'minmax':
+        return minmax(x, y, n_out)
+    if method == 'lttb':
+        x, y = minmax(x, y, 4 * n_out)
+        return lttb(x, y, n_out)
+    raise ValueError(f"不支持的降采样方法: {method}")
+
+
+class Pyramid:
+    """
+    多分辨率最小/最大值金字塔。
+
+    第 0 级每 base 个原始点一个区间，之后每级把 factor 个区间合并为一个；
+    查询任意范围时选用区间数仍多于所需点数的最粗一级，只读取该范围内的区间，
+    两端不足一个区间的零头直接扫描原始数据，范围内的极值点都会保留。
+
+    参数：
+    - x: 单调递增的横坐标（如时间），None 表示按采样点序号 / fs 计算，不额外占用内存
+    - y: 原始数据，可以是内存映射数组
+    - base, factor: 第 0 级区间长度和逐级合并倍数
+    - fs: x 为 None 时的采样频率
+    """
+
+    def __init__(self, x, y, base=64, factor=4, fs=1.0):
+        self.y = np.asarray(y)
+        self.x = None if x is None else np.asarray(x)
+        self.fs = fs
+        self.base = base
+        self.factor = factor
+        self.levels = []  # [(区间长度, min_val, min_idx, max_val, max_idx)]
+        if len(self.y) < 2 * base:
+            return
+        full = len(self.y) // base * base  # 只对完整区间建金字塔，查询时末尾零头按原始数据处理
+        level = _envelope(self.y[:full], base)
+        size = base
+        while True:
+            self.levels.append((size,) + level)
+            if len(level[0]) < 2 * factor:
+                break
+            if len(level[0]) % factor:
+                level = tuple(a[:len(a) // factor * factor] for a in level)
+            level = _merge(*level, factor)
+            size *= factor
+
+    def _index(self, value, side):
+        if self.x is not None:
+            return int(np.searchsorted(self.x, value, side=side))
+        i = np.ceil(value * self.fs) if side == 'left' else np.floor(value * self.fs) + 1
+        return int(min(max(i, 0), len(self.y)))
+
+    def _x(self, idx):
+        return self.x[idx] if self.x is not None else np.asarray(idx) / self.fs
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for level in self.levels for a in level[1:])
+
+    def query(self, x0=None, x1=None, n_out=DEFAULT_POINTS, method='minmax'):
+        """ 返回横坐标在 [x0, x1] 范围内降采样到不超过 n_out 个点的 (x, y) """
+        i0 = 0 if x0 is None else self._index(x0, 'left')
+        i1 = len(self.y) if x1 is None else self._index(x1, 'right')
+        if i1 - i0 <= n_out:
+            return self._x(np.arange(i0, i1)), self.y[i0:i1]
+
+        bins = max(1, n_out // 2)
+        level = None
+        for candidate in self.levels:
+            if (i1 - i0) // candidate[0] >= 2 * bins:
+                level = candidate
+        if level is None:
+            x, y = decimate(None, self.y[i0:i1], n_out, method)
+            return self._x(np.rint(x).astype(np.int64) + i0), y
+
+        size, min_val, min_idx, max_val, max_idx = level
+        b0 = -(-i0 // size)
+        b1 = min(i1 // size, len(min_val))
+        parts = [(min_val[b0:b1], min_idx[b0:b1], max_val[b0:b1], max_idx[b0:b1])]
+        # 两端零头直接扫描原始数据，各作为一个区间
+        for lo, hi in ((i0, b0 * size), (b1 * size, i1)):
+            if hi > lo:
+                parts.append(_envelope(self.y[lo:hi], hi - lo, offset=lo))
+        order = np.argsort(np.concatenate([p[1] for p in parts]), kind='stable')
+        merged = [np.concatenate([p[k] for p in parts])[order] for k in range(4)]
+        if len(merged[0]) > bins:
+            merged = _merge(*merged, -(-len(merged[0]) // bins))
+        idx = _minmax_indices(merged[1], merged[3])
+        x, y = self._x(idx), self.y[idx]
+        if method == 'lttb':
+            return lttb(x, y, n_out)
+        return x, y
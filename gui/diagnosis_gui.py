@@ -1,7 +1,12 @@
 import remi.gui as gui
+import utils
 
 def get_diagnosis_ui(main_app):
     """ 创建故障诊断界面 """
+    def on_back(widget):
+        main_app.jobs.cancel('diagnosis')  # 返回主界面时不再回写诊断结果
+        main_app.show_main_ui()
+
     container = gui.VBox(width="100%", height="100%")
     container.style['background-color'] = '#f4f4f9'
 
@@ -11,11 +16,27 @@ def get_diagnosis_ui(main_app):
     back_button.style['border'] = 'none'
     back_button.style['border-radius'] = '5px'
     back_button.style['margin'] = '20px'
-    back_button.onclick.do(main_app.show_main_ui)  # 返回主界面
+    back_button.onclick.do(on_back)
 
     label = gui.Label("故障诊断界面", style={"font-size": "24px", "text-align": "center", "color": "#333"})
+    result_label = gui.Label("", style={"font-size": "18px", "text-align": "center", "color": "#333"})
+
+    def on_diagnosis(widget):
+        # 特征提取、预测和保存记录在后台任务中进行；离开本页面时任务被取消，不再回写界面
+        result_label.set_text("正在诊断...")
+        signal, fs = main_app.current_signal()
+        pump = utils.pump_name(main_app.recording)
+        main_app.jobs.submit('diagnosis', lambda job: utils.diagnose_and_record(signal, fs, pump=pump),
+                             on_done=lambda result: result_label.set_text(f"诊断结果: 故障类别 {result}"),
+                             on_error=lambda e: result_label.set_text(f"诊断失败: {e}"))
+
+    start_button = gui.Button("开始诊断", width="20%", height="50px")
+    start_button.style['margin'] = '20px'
+    start_button.onclick.do(on_diagnosis)
 
     container.append(back_button)
     container.append(label)
+    container.append(start_button)
+    container.append(result_label)
 
     return container
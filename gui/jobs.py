@@ -0,0 +1,121 @@
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# 后台任务：耗时的计算（小波变换、FFT、特征提取、模型预测）不再在 remi 事件回调中同步执行。
+# 回调只提交任务并立即返回，任务在共享线程池中运行（numpy/scipy 的计算会释放 GIL），
+# 进度和结果在持有 App.update_lock 的情况下回写界面。
+#
+# 每个会话（App 实例）有一个 JobManager，同名任务再次提交时会取消旧任务；
+# 切换页面时调用 cancel_all(keep=('load',))（文件加载不随页面取消），正在运行的任务在下一个检查点（job.check / job.report）退出。
+
+_executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="job")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, manager, name, on_progress=None):
+        self.manager = manager
+        self.name = name
+        self.on_progress = on_progress
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """ 请求取消：尚未开始的任务直接取消，运行中的任务在下一个检查点退出 """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """ 检查点，任务已被取消时抛出 JobCancelled """
+        if self._cancelled.is_set():
+            raise JobCancelled(self.name)
+
+    def report(self, fraction, message=""):
+        """ 报告进度（0~1），同时作为检查点 """
+        self.check()
+        if self.on_progress is not None:
+            with self.manager.app.update_lock:
+                self.on_progress(fraction, message)
+
+
+class JobManager:
+    """ 一个会话的后台任务句柄 """
+
+    def __init__(self, app, executor=None):
+        self.app = app
+        self.executor = executor or _executor
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, on_progress=None, on_done=None, on_error=None):
+        """
+        提交任务 func(job, *args)，立即返回 Job。
+
+        - on_progress(fraction, message): 任务调用 job.report 时执行
+        - on_done(result) / on_error(exception): 任务完成后执行，已取消的任务不回调
+        所有回调都在持有 app.update_lock 时执行，可以直接修改控件。
+        """
+        job = Job(self, name, on_progress)
+        with self._lock:
+            old = self._jobs.get(name)
+            if old is not None:
+                old.cancel()
+            self._jobs[name] = job
+        job.future = self.executor.submit(self._run, job, func, args, on_done, on_error)
+        return job
+
+    def _run(self, job, func, args, on_done, on_error):
+        try:
+            job.check()
+            result = func(job, *args)
+            job.check()
+        except JobCancelled:
+            return None
+        except Exception as e:
+            if job.cancelled:
+                return None
+            if on_error is None:
+                traceback.print_exc()
+            else:
+                with self.app.update_lock:
+                    on_error(e)
+            return None
+        finally:
+            with self._lock:
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+
+        if on_done is not None:
+            with self.app.update_lock:
+                if not job.cancelled:
+                    on_done(result)
+        return result
+
+    def cancel(self, name):
+        with self._lock:
+            job = self._jobs.pop(name, None)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self, keep=()):
+        """ 取消全部任务，keep 中列出的任务名除外（如与页面无关的文件加载） """
+        with self._lock:
+            jobs = [job for name, job in self._jobs.items() if name not in keep]
+            for job in jobs:
+                del self._jobs[job.name]
+        for job in jobs:
+            job.cancel()
+
+    def running(self):
+        with self._lock:
+            return list(self._jobs)
@@ -1,9 +1,13 @@
+import os
 import remi.gui as gui
 from remi import start, App
 
 import analysis_gui
 import diagnosis_gui
 import records_gui
+import utils
+from jobs import JobManager
+from upload import StreamingFileUploader
 
 class MainApp(App):
     def __init__(self, *args):
@@ -11,9 +15,13 @@ class MainApp(App):
         self.main_container = gui.VBox(width="100%", height="100%", margin="10px")
         self.main_container.style['background-color'] = '#f4f4f9'
         self.current_page = None  # 新增页面状态跟踪
+        self.jobs = JobManager(self)  # 本会话的后台任务
+        self.recording = None  # 上传的录音（ingest.Recording）
 
-    def switch_page(self, new_page):
-        """ 统一处理所有页面切换 """
+    def switch_page(self, build_page):
+        """ 统一处理所有页面切换：先取消旧页面的任务，再构建新页面（新页面可能立即提交后台任务） """
+        self.jobs.cancel_all(keep=('load',))  # 离开当前页面时取消其未完成的计算，文件加载除外
+        new_page = build_page(self)
         try:
             if self.current_page:
                 print(f"移除旧页面: {type(self.current_page).__name__}")  # 调试日志
@@ -71,14 +79,15 @@ class MainApp(App):
         label_container = gui.VBox(width="100%", height="30%")
         label_container.style['justify-content'] = 'center'
 
-        label_welcome = gui.Label("欢迎使用离心泵故障诊断系统", style={"font-size": "24px", "text-align": "center", "color": "#333"})
-        label_container.append(label_welcome)
+        self.label_welcome = gui.Label("欢迎使用离心泵故障诊断系统", style={"font-size": "24px", "text-align": "center", "color": "#333"})
+        label_container.append(self.label_welcome)
 
         file_upload_container = gui.VBox(width="100%", height="20%")
         file_upload_container.style['align-items'] = 'center'
         file_upload_container.style['margin-top'] = '20px'
 
-        file_uploader = gui.FileUploader(width="50%", height="auto")
+        file_uploader = StreamingFileUploader(utils.UPLOAD_DIR, width="50%", height="auto")
+        file_uploader.onsuccess.do(self.on_file_upload)
         file_uploader.style['border'] = '1px solid #ccc'
         file_uploader.style['border-radius'] = '5px'
         file_uploader.style['padding'] = '10px'
@@ -92,14 +101,30 @@ class MainApp(App):
 
         return self.main_container
 
+    def on_file_upload(self, widget, filename):
+        """ 上传完成后在后台识别格式并以内存映射方式打开，分析和诊断页面使用该录音 """
+        self.label_welcome.set_text(f"正在加载文件: {os.path.basename(filename)}")
+        self.jobs.submit('load', lambda job: utils.load_recording(filename), on_done=self.on_file_loaded,
+                         on_error=lambda e: self.label_welcome.set_text(f"文件加载失败: {e}"))
+
+    def on_file_loaded(self, recording):
+        self.recording = recording
+        self.label_welcome.set_text(f"已加载文件: {os.path.basename(recording.path)}")
+
+    def current_signal(self):
+        """ 上传的录音的第一段及采样率，没有上传时返回 (None, 1000)，由各页面使用模拟信号 """
+        if self.recording is None:
+            return None, 1000
+        return utils.recording_segment(self.recording)
+
     def show_analysis_ui(self, widget=None):
-        self.switch_page(analysis_gui.get_analysis_ui(self))
+        self.switch_page(analysis_gui.get_analysis_ui)
 
     def show_diagnosis_ui(self, widget=None):
-        self.switch_page(diagnosis_gui.get_diagnosis_ui(self))
+        self.switch_page(diagnosis_gui.get_diagnosis_ui)
 
     def show_records_ui(self, widget=None):
-        self.switch_page(records_gui.get_records_ui(self))
+        self.switch_page(records_gui.get_records_ui)
 
 # 运行应用
 start(MainApp, address='0.0.0.0', port=8081, start_browser=True)
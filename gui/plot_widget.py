@@ -0,0 +1,191 @@
+import json
+import base64
+import numpy as np
+import remi.gui as gui
+
+# 浏览器端绘图：服务器只发送紧凑的数值数组（float32 曲线、uint8 量化热力图），
+# 由页面中的 <canvas> 渲染器绘制，不再在服务器上用 matplotlib 生成 PNG。
+
+PLOT_SCRIPT = """
+window.pumpPlot = window.pumpPlot || (function () {
+    var state = {};
+    var M = {left: 56, right: 12, top: 26, bottom: 36};
+
+    function bytes(b64) {
+        var bin = atob(b64), buf = new Uint8Array(bin.length);
+        for (var i = 0; i < bin.length; i++) buf[i] = bin.charCodeAt(i);
+        return buf;
+    }
+    function f32(b64) { return new Float32Array(bytes(b64).buffer); }
+
+    // jet 色表
+    var JET = new Uint8Array(256 * 3);
+    for (var i = 0; i < 256; i++) {
+        var v = i / 255;
+        var c = [1.5 - Math.abs(4 * v - 3), 1.5 - Math.abs(4 * v - 2), 1.5 - Math.abs(4 * v - 1)];
+        for (var k = 0; k < 3; k++) JET[i * 3 + k] = Math.round(255 * Math.min(1, Math.max(0, c[k])));
+    }
+
+    function setup(canvas) {
+        var r = window.devicePixelRatio || 1, w = canvas.clientWidth || 300, h = canvas.clientHeight || 150;
+        canvas.width = w * r; canvas.height = h * r;
+        var ctx = canvas.getContext('2d');
+        ctx.setTransform(r, 0, 0, r, 0, 0);
+        ctx.clearRect(0, 0, w, h);
+        ctx.font = '12px sans-serif';
+        return {ctx: ctx, w: w, h: h};
+    }
+    function fmt(v) { return Math.abs(v) >= 1e4 || (Math.abs(v) < 1e-2 && v !== 0) ? v.toExponential(1) : +v.toFixed(2); }
+
+    function axes(c, d, x0, x1, y0, y1) {
+        var ctx = c.ctx, pw = c.w - M.left - M.right, ph = c.h - M.top - M.bottom;
+        ctx.strokeStyle = '#333'; ctx.fillStyle = '#333';
+        ctx.strokeRect(M.left, M.top, pw, ph);
+        ctx.textAlign = 'center';
+        if (d.title) ctx.fillText(d.title, M.left + pw / 2, 16);
+        if (d.xlabel) ctx.fillText(d.xlabel, M.left + pw / 2, c.h - 4);
+        for (var i = 0; i <= 4; i++) {
+            ctx.fillText(fmt(x0 + (x1 - x0) * i / 4), M.left + pw * i / 4, M.top + ph + 14);
+        }
+        ctx.textAlign = 'right';
+        for (var j = 0; j <= 4; j++) {
+            ctx.fillText(fmt(y0 + (y1 - y0) * j / 4), M.left - 4, M.top + ph - ph * j / 4 + 4);
+        }
+        if (d.ylabel) {
+            ctx.save(); ctx.translate(12, M.top + ph / 2); ctx.rotate(-Math.PI / 2);
+            ctx.textAlign = 'center'; ctx.fillText(d.ylabel, 0, 0); ctx.restore();
+        }
+        return {x: M.left, y: M.top, w: pw, h: ph};
+    }
+
+    function line(c, d) {
+        var x = f32(d.x), y = f32(d.y), n = y.length;
+        if (!n) return;
+        var x0 = x[0], x1 = x[n - 1], y0 = Infinity, y1 = -Infinity;
+        for (var i = 0; i < n; i++) { if (y[i] < y0) y0 = y[i]; if (y[i] > y1) y1 = y[i]; }
+        if (y1 === y0) { y0 -= 1; y1 += 1; }
+        if (x1 === x0) x1 = x0 + 1;
+        var r = axes(c, d, x0, x1, y0, y1), ctx = c.ctx;
+        ctx.save(); ctx.beginPath(); ctx.rect(r.x, r.y, r.w, r.h); ctx.clip();
+        ctx.strokeStyle = d.color || '#1f77b4'; ctx.lineWidth = 1; ctx.beginPath();
+        for (var j = 0; j < n; j++) {
+            var px = r.x + (x[j] - x0) / (x1 - x0) * r.w, py = r.y + r.h - (y[j] - y0) / (y1 - y0) * r.h;
+            if (j) ctx.lineTo(px, py); else ctx.moveTo(px, py);
+        }
+        ctx.stroke(); ctx.restore();
+    }
+
+    function heatmap(c, d) {
+        var z = bytes(d.z), rows = d.rows, cols = d.cols;
+        var img = document.createElement('canvas'); img.width = cols; img.height = rows;
+        var ictx = img.getContext('2d'), data = ictx.createImageData(cols, rows);
+        for (var i = 0; i < rows; i++) {
+            var src = d.origin === 'lower' ? rows - 1 - i : i;
+            for (var j = 0; j < cols; j++) {
+                var v = z[src * cols + j], o = (i * cols + j) * 4;
+                data.data[o] = JET[v * 3]; data.data[o + 1] = JET[v * 3 + 1]; data.data[o + 2] = JET[v * 3 + 2]; data.data[o + 3] = 255;
+            }
+        }
+        ictx.putImageData(data, 0, 0);
+        var e = d.extent, r = axes(c, d, e[0], e[1], e[2], e[3]);
+        c.ctx.imageSmoothingEnabled = false;
+        c.ctx.drawImage(img, r.x, r.y, r.w, r.h);
+    }
+
+    function message(c, text) {
+        c.ctx.fillStyle = '#333'; c.ctx.textAlign = 'center'; c.ctx.font = '15px sans-serif';
+        c.ctx.fillText(text, c.w / 2, c.h / 2);
+    }
+
+    function draw(canvas) {
+        var d = state[canvas.id], c = setup(canvas);
+        if (!d) message(c, canvas.getAttribute('data-message') || '');
+        else if (d.kind === 'line') line(c, d);
+        else if (d.kind === 'heatmap') heatmap(c, d);
+        else message(c, d.text);
+        canvas.setAttribute('data-drawn', d ? d.version : 0);
+    }
+
+    // remi 重新渲染界面时画布会被替换，定时检查并重绘
+    setInterval(function () {
+        var canvases = document.querySelectorAll('canvas.pump-plot');
+        for (var i = 0; i < canvases.length; i++) {
+            var d = state[canvases[i].id];
+            if (canvases[i].getAttribute('data-drawn') !== String(d ? d.version : 0)) draw(canvases[i]);
+        }
+    }, 300);
+    window.addEventListener('resize', function () {
+        var canvases = document.querySelectorAll('canvas.pump-plot');
+        for (var i = 0; i < canvases.length; i++) draw(canvases[i]);
+    });
+
+    return {
+        update: function (id, d) {
+            d.version = (state[id] ? state[id].version : 0) + 1;
+            state[id] = d;
+            var canvas = document.getElementById(id);
+            if (canvas) draw(canvas);
+        }
+    };
+})();
+"""
+PLOT_JS = "<script>" + PLOT_SCRIPT + "</script>"
+
+
+def install(app):
+    """
+    注入浏览器端渲染脚本，每个 App 只注入一次：
+    写入页面 head，之后加载的页面都带有脚本；remi 只在页面首次请求时发送 head，
+    所以同时通过 execute_javascript 在已经打开的页面中执行一次（脚本重复执行无副作用）。
+    """
+    if getattr(app, '_pump_plot_installed', False):
+        return
+    app.page.children['head'].add_child('pump_plot_js', PLOT_JS)
+    app.execute_javascript(PLOT_SCRIPT)
+    app._pump_plot_installed = True
+
+
+def _b64(array, dtype):
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+
+class CanvasPlot(gui.Widget):
+    """ 浏览器端绘制的曲线 / 热力图控件，用法与 gui.Image 类似，但只传输数值数据 """
+
+    def __init__(self, app, message="等待数据传入", *args, **kwargs):
+        super(CanvasPlot, self).__init__(*args, _type='canvas', **kwargs)
+        self.app = app
+        self.add_class('pump-plot')
+        self.attributes['data-message'] = message
+        install(app)
+
+    def _send(self, payload):
+        code = "pumpPlot.update(%s, %s);" % (json.dumps(self.identifier), json.dumps(payload))
+        self.app.execute_javascript(code)
+
+    def show_message(self, text):
+        self.attributes['data-message'] = text
+        self._send({'kind': 'message', 'text': text})
+
+    def plot_line(self, x, y, title="", xlabel="", ylabel="", color="#1f77b4"):
+        """ 绘制曲线，x、y 以 float32 发送 """
+        self._send({'kind': 'line', 'x': _b64(x, '<f4'), 'y': _b64(y, '<f4'),
+                    'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'color': color})
+
+    def plot_heatmap(self, z, extent, title="", xlabel="", ylabel="", origin='upper', max_columns=512):
+        """
+        绘制热力图（jet 色表），z 量化为 uint8 发送。
+
+        extent 与 matplotlib imshow 相同：(x0, x1, y_bottom, y_top)；
+        列数超过 max_columns 时按列分段取最大值，保留瞬态峰值。
+        """
+        z = np.asarray(z, dtype=np.float64)
+        if z.shape[1] > max_columns:
+            edges = np.linspace(0, z.shape[1], max_columns + 1).astype(int)[:-1]
+            z = np.maximum.reduceat(z, edges, axis=1)
+        zmin, zmax = float(z.min()), float(z.max())
+        scale = 255.0 / (zmax - zmin) if zmax > zmin else 0.0
+        q = np.rint((z - zmin) * scale).astype(np.uint8)
+        self._send({'kind': 'heatmap', 'z': _b64(q, np.uint8), 'rows': q.shape[0], 'cols': q.shape[1],
+                    'extent': [float(v) for v in extent], 'origin': origin,
+                    'title': title, 'xlabel': xlabel, 'ylabel': ylabel, 'zmin': zmin, 'zmax': zmax})
@@ -1,4 +1,5 @@
 import remi.gui as gui
+from records_view import RecordsView
 
 def get_records_ui(main_app):
     """ 创建读取诊断记录界面 """
@@ -17,5 +18,6 @@ def get_records_ui(main_app):
 
     container.append(back_button)
     container.append(label)
+    container.append(RecordsView(width="100%"))
 
     return container
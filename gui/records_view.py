@@ -0,0 +1,80 @@
+import time
+import remi.gui as gui
+from utils import records
+from renderer import to_data_uri
+
+ALL_PUMPS = "全部泵"
+PAGE_SIZE = 50
+
+
+class RecordsView(gui.VBox):
+    """
+    诊断记录列表：按泵筛选，按时间倒序，每次只加载一页（键集分页），
+    点击“加载更多”再取下一页；点击某一行时才读取该记录的特征和缩略图。
+    """
+
+    def __init__(self, store=None, page_size=PAGE_SIZE, *args, **kwargs):
+        super(RecordsView, self).__init__(*args, **kwargs)
+        self.store = store or records.get_store()
+        self.page_size = page_size
+        self.cursor = None
+
+        self.dropdown = gui.DropDown(width="200px", height="30px")
+        self.dropdown.onchange.do(self.on_pump_change)
+        self.table = gui.Table(width="90%")
+        self.table.on_table_row_click.do(self.on_row_click)
+        self.more_button = gui.Button("加载更多", width="20%", height="40px")
+        self.more_button.onclick.do(lambda _: self.load_page())
+        self.detail_label = gui.Label("", width="100%", style={"text-align": "center"})
+        self.thumbnail = gui.Image("", width="300px", height="auto")
+
+        self.append(self.dropdown)
+        self.append(self.table)
+        self.append(self.more_button)
+        self.append(self.detail_label)
+        self.append(self.thumbnail)
+        self.refresh()
+
+    def refresh(self):
+        """ 重新读取泵列表并从第一页开始显示 """
+        self.dropdown.empty()
+        self.dropdown.append(gui.DropDownItem(ALL_PUMPS))
+        for pump in self.store.pumps():
+            self.dropdown.append(gui.DropDownItem(pump))
+        self.dropdown.select_by_value(ALL_PUMPS)
+        self.reset()
+
+    def reset(self):
+        self.table.empty()
+        self.table.append_from_list([("编号", "泵", "时间", "诊断结果")], fill_title=True)
+        self.cursor = None
+        self.load_page()
+
+    def on_pump_change(self, widget, value):
+        self.reset()
+
+    def load_page(self):
+        pump = self.dropdown.get_value()
+        rows, self.cursor = self.store.page(pump=None if pump in (None, ALL_PUMPS) else pump,
+                                            cursor=self.cursor, limit=self.page_size)
+        for record in rows:
+            row = gui.TableRow()
+            row.record_id = record.id
+            for i, text in enumerate((str(record.id), record.pump,
+                                      time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.ts)),
+                                      f"故障类别 {record.verdict}")):
+                row.append(gui.TableItem(text), str(i))
+            self.table.append(row, str(record.id))
+        self.more_button.set_enabled(self.cursor is not None)
+        if len(self.table.children) == 1:
+            self.detail_label.set_text("暂无诊断记录")
+
+    def on_row_click(self, table, row, item):
+        record = self.store.get(getattr(row, 'record_id', None))
+        if record is None:
+            return
+        text = f"记录 {record.id}：{record.pump}，故障类别 {record.verdict}"
+        if record.features is not None:
+            text += "，特征 " + " ".join(f"{v:.3g}" for v in record.features[:4]) + " ..."
+        self.detail_label.set_text(text)
+        self.thumbnail.set_image(to_data_uri(record.thumbnail) if record.thumbnail else "")
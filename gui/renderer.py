@@ -0,0 +1,250 @@
+import io
+import time
+import base64
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# 服务器端静态图渲染（PNG 导出、CWT 图像等）。
+#
+# 每个 (会话, 图位) 常驻一个 Agg Figure，第一次渲染时建好坐标轴和曲线/图像，
+# 之后只通过 set_data / set_array 更新数据再重新绘制，不再每次 plt.subplots 重建坐标轴、字体和色表。
+# 不经过 pyplot，图形不会登记到全局图形管理器中；常驻图形数量有上限，长时间未使用的会被释放。
+# 释放图形时先取得该图形的锁，正在渲染的图形不会被清空；已释放的图形不再用于渲染。
+
+# 中文字体（标题、坐标轴标签），按顺序使用第一个已安装的字体
+matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Noto Sans CJK SC', 'WenQuanYi Micro Hei',
+                                          *matplotlib.rcParams['font.sans-serif']]
+matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+
+class _Slot:
+    """ 一个常驻图形及其可复用的绘图元素 """
+
+    def __init__(self, size, dpi):
+        self.figure = Figure(figsize=size, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.size = size
+        self.kind = None
+        self.artist = None
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def prepare(self, kind):
+        """ 图位第一次使用或绘图类型改变时重建坐标轴内容，返回是否为新建 """
+        if self.kind == kind:
+            return False
+        self.ax.clear()
+        self.kind = kind
+        self.artist = None
+        return True
+
+    def labels(self, title, xlabel, ylabel):
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+
+    def png(self, layout):
+        if layout:
+            # 只在建图时计算一次边距，之后的刷新沿用
+            self.figure.tight_layout()
+        buffer = io.BytesIO()
+        self.canvas.print_png(buffer)
+        return buffer.getvalue()
+
+    def close(self):
+        """ 释放图形内容，调用方需持有 lock """
+        self.figure.clear()
+        self.artist = None
+        self.closed = True
+
+
+class FigureRenderer:
+    """
+    参数：
+    - max_figures: 常驻图形数上限，超过时释放最久未使用的
+    - idle_seconds: 超过该时长未使用的图形会被释放
+    """
+
+    def __init__(self, max_figures=32, idle_seconds=600.0, dpi=100):
+        self.max_figures = max_figures
+        self.idle_seconds = idle_seconds
+        self.dpi = dpi
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _acquire(self, session, slot, size):
+        key = (session, slot)
+        released = []
+        with self._lock:
+            now = time.monotonic()
+            entry = self._slots.get(key)
+            if entry is not None and entry.size != size:
+                released.append(self._slots.pop(key))
+                entry = None
+            if entry is None:
+                entry = self._slots[key] = _Slot(size, self.dpi)
+                self.created += 1
+            entry.last_used = now
+            self._slots.move_to_end(key)
+            released += self._evict(now)
+        self._close(released)
+        return entry
+
+    @contextmanager
+    def _use(self, session, slot, size):
+        """ 取得图位并持有其锁；取得锁之前图形已被释放时换一个新图形 """
+        while True:
+            entry = self._acquire(session, slot, size)
+            with entry.lock:
+                if not entry.closed:
+                    yield entry
+                    return
+
+    def _evict(self, now):
+        """ 从表中移除需要释放的图形并返回，调用方需持有 self._lock """
+        evicted = []
+        while self._slots:
+            key, entry = next(iter(self._slots.items()))
+            if len(self._slots) <= self.max_figures and now - entry.last_used <= self.idle_seconds:
+                break
+            del self._slots[key]
+            evicted.append(entry)
+            self.evicted += 1
+        return evicted
+
+    @staticmethod
+    def _close(entries):
+        # 在 self._lock 之外逐个等待正在进行的渲染结束后再清空
+        for entry in entries:
+            with entry.lock:
+                entry.close()
+
+    def release(self, session):
+        """ 会话结束时释放其全部图形 """
+        with self._lock:
+            released = [self._slots.pop(key) for key in [key for key in self._slots if key[0] == session]]
+        self._close(released)
+
+    def render_line(self, session, slot, x, y, title="", xlabel="", ylabel="", size=(6, 3), color='#1f77b4'):
+        """ 曲线图，返回 PNG 字节 """
+        with self._use(session, slot, size) as entry:
+            new = entry.prepare('line')
+            if new:
+                entry.artist, = entry.ax.plot(x, y, color=color)
+            else:
+                entry.artist.set_data(x, y)
+                entry.artist.set_color(color)
+                entry.ax.relim()
+                entry.ax.autoscale_view()
+            entry.labels(title, xlabel, ylabel)
+            return entry.png(new)
+
+    def render_image(self, session, slot, z, extent, title="", xlabel="", ylabel="", size=(6, 3), cmap='jet',
+                     origin='upper'):
+        """ 热力图（如小波系数幅值），extent 与 imshow 相同，返回 PNG 字节 """
+        z = np.asarray(z)
+        with self._use(session, slot, size) as entry:
+            new = entry.prepare(('image', origin))
+            if new:
+                entry.artist = entry.ax.imshow(z, aspect='auto', cmap=cmap, extent=extent, origin=origin)
+            else:
+                entry.artist.set_data(z)
+                entry.artist.set_extent(extent)
+                entry.artist.set_cmap(cmap)
+            entry.artist.set_clim(float(z.min()), float(z.max()))
+            entry.labels(title, xlabel, ylabel)
+            return entry.png(new)
+
+    def render_message(self, session, slot, text, size=(6, 3)):
+        """ 只显示一行文字的占位图（如“等待数据传入”），返回 PNG 字节 """
+        with self._use(session, slot, size) as entry:
+            new = entry.prepare('message')
+            if new:
+                entry.ax.set_axis_off()
+                entry.artist = entry.ax.text(0.5, 0.5, text, ha='center', va='center', fontsize=15,
+                                             transform=entry.ax.transAxes)
+            else:
+                entry.artist.set_text(text)
+            return entry.png(False)
+
+
+class RenderCache:
+    """
+    渲染结果的 LRU 缓存，所有会话共享，按总字节数淘汰。
+
+    参数：
+    - max_bytes: 缓存的图像数据总字节数上限
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """ value 为 bytes 或 str；单个超过上限的结果不缓存 """
+        size = len(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = value
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def to_data_uri(png):
+    return "data:image/png;base64," + base64.b64encode(png).decode()
+
+
+# 进程内共享的渲染器
+renderer = FigureRenderer()
@@ -0,0 +1,76 @@
+import os
+from urllib.parse import unquote
+import remi.gui as gui
+
+# 分块上传：remi 自带的 FileUploader 把整个文件作为一个表单 POST，
+# 服务器端 read() 成一个 bytes 再整体写盘，几百 MB 的录音会整个驻留在内存中。
+# StreamingFileUploader 在浏览器端用 File.slice 把文件切成 CHUNK_BYTES 大小的块依次上传，
+# 服务器端按偏移写入 .part 文件，最后一块写完后改名，内存占用只与块大小有关。
+# remi 只把 filename 请求头传给回调，块的偏移和文件总大小编码在其中："偏移:总大小:文件名"。
+# 脚本放在 onchange 属性中，不能包含双引号。
+
+CHUNK_BYTES = 4 * 2 ** 20
+
+UPLOAD_JS = """
+(function (input) {
+    var files = input.files;
+    function send(file, offset) {
+        var end = Math.min(offset + %(chunk)d, file.size);
+        var xhr = new XMLHttpRequest(), fd = new FormData();
+        xhr.open('POST', '/', true);
+        xhr.setRequestHeader('filename', offset + ':' + file.size + ':' + encodeURIComponent(file.name));
+        xhr.setRequestHeader('listener', '%(id)s');
+        xhr.setRequestHeader('listener_function', 'onchunk');
+        xhr.onreadystatechange = function () {
+            if (xhr.readyState != 4) return;
+            if (xhr.status == 200 && end < file.size) {
+                send(file, end);
+            } else {
+                var event = xhr.status == 200 ? 'onsuccess' : 'onfailed';
+                remi.sendCallbackParam('%(id)s', event, {filename: encodeURIComponent(file.name)});
+            }
+        };
+        fd.append('upload_file', file.slice(offset, end), file.name);
+        xhr.send(fd);
+    }
+    for (var i = 0; i < files.length; i++) send(files[i], 0);
+})(this);
+"""
+
+
+class StreamingFileUploader(gui.FileUploader):
+    """
+    与 gui.FileUploader 用法相同，但分块上传；onsuccess / onfailed 回调收到的是保存后的完整路径。
+    """
+
+    def __init__(self, savepath='./', *args, chunk_bytes=CHUNK_BYTES, **kwargs):
+        super(StreamingFileUploader, self).__init__(savepath, *args, **kwargs)
+        self.attributes[self.EVENT_ONCHANGE] = UPLOAD_JS % {'chunk': chunk_bytes, 'id': self.identifier}
+
+    def _path(self, name):
+        # 只保留文件名，防止路径穿越
+        return os.path.join(self._savepath, os.path.basename(unquote(name)))
+
+    def onchunk(self, filedata, header):
+        """ 写入一个数据块，最后一块写完后把 .part 文件改名为最终文件 """
+        offset, total, name = header.split(':', 2)
+        offset, total = int(offset), int(total)
+        path = self._path(name)
+        part = path + '.part'
+        if offset == 0:
+            os.makedirs(self._savepath, exist_ok=True)
+        with open(part, 'r+b' if offset else 'wb') as f:
+            f.seek(offset)
+            f.write(filedata)
+        if offset + len(filedata) >= total:
+            os.replace(part, path)
+
+    @gui.decorate_set_on_listener("(self, emitter, filename)")
+    @gui.decorate_event
+    def onsuccess(self, filename):
+        return (self._path(filename), )
+
+    @gui.decorate_set_on_listener("(self, emitter, filename)")
+    @gui.decorate_event
+    def onfailed(self, filename):
+        return (self._path(filename), )
@@ -1,10 +1,67 @@
+import os
+import sys
+import hashlib
 import numpy as np
-import matplotlib.pyplot as plt
-import pywt
-import io
-import base64
 
-def generate_cwt_image(signal=None, fs=1000, wavelet='cmor', width=6, height=3):
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model')
+sys.path.append(MODEL_DIR)
+import fast_cwt
+import batch_scheduler
+import svm_numpy
+import ingest
+import records
+from renderer import renderer, RenderCache, to_data_uri
+from decimate import minmax
+
+VIBRATION_MODEL = os.path.join(MODEL_DIR, 'vibration_svm.pkl')
+UPLOAD_DIR = os.environ.get('PUMP_UPLOAD_DIR', 'uploads')
+DEFAULT_PUMP = "模拟信号"  # 未上传录音时诊断记录使用的泵编号
+
+# 已渲染的 CWT 图像，所有会话共享；同一信号、同一参数再次打开时直接返回
+cwt_image_cache = RenderCache(max_bytes=64 * 2 ** 20)
+
+
+def signal_digest(signal):
+    """ 信号内容摘要（含数据类型和形状） """
+    signal = np.ascontiguousarray(signal)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{signal.dtype.str}{signal.shape}".encode('utf-8'))
+    h.update(memoryview(signal).cast('B'))
+    return h.hexdigest()
+
+
+def load_recording(path, fs=1000):
+    """ 打开上传的录音（文本 / WAV / npy / raw），信号以内存映射方式访问 """
+    return ingest.open_recording(path, fs=fs)
+
+
+def recording_segment(recording, max_points=8192, row=0):
+    """ 取录音中第 row 个样本（或通道）的前 max_points 个点作为分析信号，返回 (signal, fs) """
+    signal = np.array(recording.samples[row, :max_points], dtype=np.float64)
+    return signal, recording.fs
+
+
+def compute_cwt(signal, fs=1000, wavelet='cmor', scales=tuple(range(1, 128)), job=None, n_steps=4):
+    """
+    分段计算小波变换，返回 (coefficients, frequencies)。
+
+    在后台任务中运行时传入 job：尺度分为 n_steps 段依次计算，每段之后报告进度，
+    任务被取消时在段间退出。
+    """
+    if job is None:
+        return fast_cwt.cwt(signal, np.asarray(scales), wavelet, 1/fs)
+    coefficients, frequencies = [], []
+    for i, chunk in enumerate(np.array_split(np.asarray(scales), n_steps)):
+        job.check()
+        c, f = fast_cwt.cwt(signal, chunk, wavelet, 1/fs)
+        coefficients.append(c)
+        frequencies.append(f)
+        job.report((i + 1) / n_steps, "正在计算小波变换")
+    return np.concatenate(coefficients), np.concatenate(frequencies)
+
+
+def generate_cwt_image(signal=None, fs=1000, wavelet='cmor', width=6, height=3, session=None,
+                       scales=tuple(range(1, 128)), job=None):
     """
     生成时频域分析（CWT）图像并返回 Base64 编码的图片数据。
     
@@ -13,36 +70,81 @@ def generate_cwt_image(signal=None, fs=1000, wavelet='cmor', width=6, height=3):
     - fs: 采样频率，默认为 1000 Hz
     - wavelet: 选择的小波函数，默认 'cmor'
     - width, height: 生成图片的尺寸
+    - session: 会话标识，同一会话反复生成时复用同一个常驻图形
+    - scales: 小波尺度
+    - job: 在后台任务中运行时传入，分段报告进度，取消后在渲染前退出
     """
     # 生成测试信号（如果没有提供）
     if signal is None:
         t = np.linspace(0, 1, fs)
         signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
 
+    key = (signal_digest(signal), wavelet, fs, tuple(scales), width, height)
+    image = cwt_image_cache.get(key)
+    if image is not None:
+        return image
+
     # 计算小波变换
-    scales = np.arange(1, 128)
-    coefficients, frequencies = pywt.cwt(signal, scales, wavelet, 1/fs)
-
-    # 绘制时频分析图
-    fig, ax = plt.subplots(figsize=(width, height), dpi=100)
-    ax.imshow(np.abs(coefficients), aspect='auto', cmap='jet', extent=[0, 1, frequencies[-1], frequencies[0]])
-    ax.set_ylabel("频率 (Hz)")
-    ax.set_xlabel("时间 (s)")
-    ax.set_title("时频域分析 (CWT)")
-    ax.invert_yaxis()
-    
-    # 保存为 Base64 编码的图片
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', bbox_inches='tight')
-    img_buffer.seek(0)
-    plt.close(fig)
+    coefficients, frequencies = compute_cwt(signal, fs, wavelet, scales, job=job)
+    if job is not None:
+        job.check()
+
+    # 绘制时频分析图（低频在上方，与原先 invert_yaxis 的效果一致）
+    duration = len(signal) / fs
+    png = renderer.render_image(session, 'cwt', np.abs(coefficients), extent=[0, duration, frequencies[0], frequencies[-1]],
+                                title="时频域分析 (CWT)", xlabel="时间 (s)", ylabel="频率 (Hz)",
+                                size=(width, height), origin='lower')
+    return cwt_image_cache.put(key, to_data_uri(png))
+
+
+def vibration_model():
+    """
+    诊断使用的振动模型：已导出且不旧于 .pkl 的 .npz 优先（纯 NumPy，不需要导入 sklearn）。
+    每次诊断时重新判断，界面运行期间导出或重新训练的模型都会生效。
+    """
+    return svm_numpy.model_path(VIBRATION_MODEL)
+
+
+def _diagnosis_signal(signal, fs):
+    if signal is None:
+        t = np.linspace(0, 1, fs)
+        signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
+    return np.asarray(signal, dtype=np.float64)
+
+
+def diagnose_fault(signal=None, fs=1000, model_name=None):
+    """
+    离心泵故障诊断：提取振动特征后提交给所有会话共享的微批调度器。
+
+    返回 concurrent.futures.Future，结果为故障类别；多个会话同时诊断时，
+    请求会被合并成一批，只调用一次模型。
+    """
+    from vibration_features import extract_vibration_features
+
+    features = extract_vibration_features(_diagnosis_signal(signal, fs))
+    return batch_scheduler.get_svm_scheduler(model_name or vibration_model()).submit(features)
+
 
-    return "data:image/png;base64," + base64.b64encode(img_buffer.getvalue()).decode()
+def pump_name(recording):
+    """ 诊断记录的泵编号：上传文件名（不含扩展名），未上传时为 DEFAULT_PUMP """
+    if recording is None:
+        return DEFAULT_PUMP
+    return os.path.splitext(os.path.basename(recording.path))[0]
 
 
-def diagnose_fault():
+def diagnose_and_record(signal=None, fs=1000, pump=DEFAULT_PUMP, model_name=None):
     """
-    模拟离心泵故障诊断，计算信号能量并返回是否故障。
+    诊断并保存记录（泵编号、时间、故障类别、各类别得分、特征向量、波形缩略图），返回故障类别。
 
+    会等待调度器给出结果，应在后台任务中调用。
     """
+    from vibration_features import extract_vibration_features
 
+    signal = _diagnosis_signal(signal, fs)
+    features = extract_vibration_features(signal)
+    scheduler = batch_scheduler.get_svm_scheduler(model_name or vibration_model(), scores=True)
+    verdict, scores = scheduler.submit(features).result()
+    t, y = minmax(None, signal, 400)
+    thumbnail = renderer.render_line(None, 'thumbnail', t / fs, y, size=(3, 1.2))
+    records.get_store().add(pump, verdict, probabilities=scores, features=features, thumbnail=thumbnail)
+    return verdict
@@ -1,32 +1,21 @@
+import os
+import sys
 import remi.gui as gui
 from remi import start, App
 import numpy as np
-import matplotlib.pyplot as plt
-import pywt
-from io import BytesIO
-import base64
-
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 处理中文字体
-plt.rcParams['axes.unicode_minus'] = False  # 处理负号问题
-
-def generate_placeholder_image():
-    """ 生成默认占位图 """
-    fig, ax = plt.subplots(figsize=(6, 3), dpi=100)
-    ax.text(0.5, 0.5, "等待数据传入", fontsize=15, ha='center', va='center')
-    ax.axis("off")
-    return fig_to_base64(fig)
-
-def fig_to_base64(fig):
-    """ 将 matplotlib 图表转换为 base64 字符串 """
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    return "data:image/png;base64," + base64.b64encode(buf.read()).decode("utf-8")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui'))
+from utils import diagnose_and_record, pump_name, compute_cwt, load_recording, recording_segment, UPLOAD_DIR
+from plot_widget import CanvasPlot
+from jobs import JobManager
+from upload import StreamingFileUploader
+from records_view import RecordsView
 
 class PumpFaultDetectionApp(App):
     def main(self):
-        self.data = None
-        self.placeholder_img = generate_placeholder_image()
+        self.data = None  # 上传的录音（ingest.Recording），未上传时使用模拟信号
+        self.jobs = JobManager(self)  # 本会话的后台任务
 
         # 主容器
         self.container = gui.VBox(width="100%", height="100%", margin="10px")
@@ -49,14 +38,15 @@ class PumpFaultDetectionApp(App):
         
         self.info_label = gui.Label("欢迎使用离心泵故障诊断系统", width="100%", height="50px", style={"text-align": "center", "font-size": "20px"})
         
-        self.file_uploader = gui.FileUploader(width="100%", height="auto")
+        self.file_uploader = StreamingFileUploader(UPLOAD_DIR, width="100%", height="auto")
         self.file_uploader.onsuccess.do(self.on_file_upload)
         
         # 分析界面（默认隐藏）
         self.analysis_container = gui.VBox(width="100%", height="60%")
         self.canvas_container = gui.HBox(width="100%",height="60%")
-        self.time_domain_canvas = gui.Image(self.placeholder_img, width="100%", height="90%")
-        self.freq_domain_canvas = gui.Image(self.placeholder_img, width="100%", height="90%")
+        # 浏览器端绘制，未传入数据时显示“等待数据传入”
+        self.time_domain_canvas = CanvasPlot(self, width="100%", height="90%")
+        self.freq_domain_canvas = CanvasPlot(self, width="100%", height="90%")
         self.start_analysis_btn = gui.Button("开始分析", width="30%", height="50px")
         self.start_analysis_btn.onclick.do(self.perform_analysis)
         
@@ -67,24 +57,12 @@ class PumpFaultDetectionApp(App):
         
         #诊断界面
         self.judge_button = gui.Button("开始诊断", width="50%", height="50px")
-        #self.judge_button.onclick.do()
+        self.judge_button.onclick.do(self.on_diagnosis)
         self.save_button = gui.Button("导出诊断结果",width="50%", height="50px")
         #self.save_button.onclick.do()
 
-        #查看记录界面
-        # 创建下拉菜单 (DropDown)
-        self.dropdown = gui.DropDown(width="200px", height="30px")
-        
-        # 向下拉菜单中添加选项
-        self.dropdown.append("选项1")
-        self.dropdown.append("选项2")
-        self.dropdown.append("选项3")
-        
-        # 为下拉菜单绑定选择事件
-        #self.dropdown.onchange.do(self.on_dropdown_change)
-
-        # 标签，显示选择的值
-        self.dropdown_label = gui.Label("选择的选项: ", width="100%", height="30px")
+        #查看记录界面（按泵筛选，分页加载）
+        self.records_view = RecordsView(width="100%")
 
         # 添加组件
         self.container.append(self.button_container)
@@ -94,6 +72,7 @@ class PumpFaultDetectionApp(App):
         return self.container
 
     def show_main_view(self, widget=None):
+        self.jobs.cancel_all(keep=('load',))  # 离开当前界面时取消未完成的计算，文件加载除外
         self.container.empty()
         self.container.append(self.button_container)
         self.container.append(self.info_label)
@@ -101,6 +80,7 @@ class PumpFaultDetectionApp(App):
         self.container.append(self.file_uploader)
 
     def show_analysis_view(self, widget):
+        self.jobs.cancel_all(keep=('load',))
         self.container.empty()
         self.container.append(self.back_button)
         self.container.append(self.button_container)
@@ -109,41 +89,81 @@ class PumpFaultDetectionApp(App):
         self.container.append(self.analysis_container)
 
     def show_diagnosis_view(self,widget):
+        self.jobs.cancel_all(keep=('load',))
         self.container.empty()
         self.container.append(self.back_button)
         self.container.append(self.button_container)
-        self.judge_button = gui.Button("开始诊断", width="50%", height="50px")
-
-        self.save_button = gui.Button("导出诊断结果",width="50%", height="50px")
+        self.container.append(self.info_label)
+        self.info_label.set_text("请点击‘开始诊断’")
+        self.container.append(self.judge_button)
+        self.container.append(self.save_button)
 
     def show_records_view(self,widget):
+        self.jobs.cancel_all(keep=('load',))
         self.container.empty()
         self.container.append(self.back_button)
         self.container.append(self.button_container)
-        self.container.append(self.dropdown)
-        self.container.append(self.dropdown_label)
+        self.records_view.refresh()
+        self.container.append(self.records_view)
 
-    def on_file_upload(self, widget, filename):
-        self.info_label.set_text(f"已选择文件: {filename}")
+    def on_diagnosis(self, widget):
+        # 特征提取在后台任务中进行，预测请求交给共享调度器，与其他会话的请求合并成一批，结果保存到记录库
+        self.info_label.set_text("正在诊断...")
+        signal, fs = self.current_signal()
+        self.jobs.submit('diagnosis', lambda job: diagnose_and_record(signal, fs, pump=pump_name(self.data)),
+                         on_done=self.on_diagnosis_done, on_error=self.on_diagnosis_error)
 
-    def perform_analysis(self, widget):
-        # 生成信号数据
+    def on_diagnosis_done(self, result):
+        # 后台任务的回调已持有 update_lock
+        self.info_label.set_text(f"诊断结果: 故障类别 {result}")
+
+    def on_diagnosis_error(self, error):
+        self.info_label.set_text(f"诊断失败: {error}")
+
+    def on_file_upload(self, widget, filename):
+        # 文本数据需要先转换为二进制，放在后台进行
+        self.info_label.set_text(f"正在加载文件: {os.path.basename(filename)}")
+        self.jobs.submit('load', lambda job: load_recording(filename), on_done=self.on_file_loaded,
+                         on_error=self.on_job_error)
+
+    def on_file_loaded(self, recording):
+        self.data = recording
+        self.info_label.set_text(f"已选择文件: {os.path.basename(recording.path)}"
+                                 f"（{recording.format}，{recording.samples.shape[0]} × {recording.samples.shape[1]}）")
+
+    def current_signal(self):
+        """ 当前分析的信号：上传的录音的第一段，没有上传时为模拟信号 """
+        if self.data is not None:
+            return recording_segment(self.data)
         fs = 1000  # 采样率
         t = np.linspace(0, 1, fs)
-        signal = np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t)
-        
-        # 计算 CWT 变换
-        scales = np.arange(1, 128)
-        coefficients, frequencies = pywt.cwt(signal, scales, 'cmor', sampling_period=1/fs)
-        
-        # 绘制时频图
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.imshow(np.abs(coefficients), aspect='auto', extent=[0, 1, 1, 128], cmap='jet')
-        ax.set_title("时频分析（CWT）")
-        ax.set_xlabel("时间 (s)")
-        ax.set_ylabel("尺度")
+        return np.sin(2 * np.pi * 50 * t) + 0.5 * np.sin(2 * np.pi * 120 * t), fs
+
+    def perform_analysis(self, widget):
+        # 计算交给后台任务，事件回调立即返回
+        self.info_label.set_text("正在分析...")
+        self.jobs.submit('analysis', self.analysis_job, on_progress=self.on_job_progress,
+                         on_done=self.on_analysis_done, on_error=self.on_job_error)
+
+    def analysis_job(self, job):
+        signal, fs = self.current_signal()
         
-        self.time_domain_canvas.set_image(fig_to_base64(fig))
+        # 计算 CWT 变换（分段计算并报告进度）
+        coefficients, frequencies = compute_cwt(signal, fs, 'cmor', job=job)
+        return np.abs(coefficients), len(signal) / fs
+
+    def on_analysis_done(self, result):
+        magnitude, duration = result
+        # 绘制时频图（量化为 uint8 发送到浏览器绘制）
+        self.time_domain_canvas.plot_heatmap(magnitude, extent=[0, duration, 1, 128],
+                                             title="时频分析（CWT）", xlabel="时间 (s)", ylabel="尺度")
+        self.info_label.set_text("分析完成")
+
+    def on_job_progress(self, fraction, message):
+        self.info_label.set_text(f"{message} {fraction:.0%}")
+
+    def on_job_error(self, error):
+        self.info_label.set_text(f"计算失败: {error}")
 
 # 运行应用
 start(PumpFaultDetectionApp, address='0.0.0.0', port=8081, start_browser=True)
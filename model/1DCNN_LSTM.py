@@ -1,127 +1,103 @@
+import argparse
 import numpy as np
-import librosa
-import librosa.display
-import pywt
-import matplotlib.pyplot as plt
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, LSTM, TimeDistributed
-from tensorflow.keras.layers import Dropout, BatchNormalization, Reshape
-from tensorflow.keras.utils import to_categorical
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import joblib
-
-
-#  1. 数据处理
-
-
-# 声学数据特征提取（梅尔频谱）
-def extract_acoustic_features(audio_data, sr=16000, n_mels=128):
-    mel_spectrogram = librosa.feature.melspectrogram(y=audio_data, sr=sr, n_mels=n_mels)
-    mel_db = librosa.power_to_db(mel_spectrogram, ref=np.max)  # 转换为 dB
-    return mel_db
-
-# 振动数据特征提取（小波变换 CWT）
-def extract_vibration_features(vibration_data):
-    scales = np.arange(1, 64)  # 64 级小波变换
-    coeffs, _ = pywt.cwt(vibration_data, scales, wavelet='morl')  # CWT 变换
-    return np.abs(coeffs)  # 取绝对值
-
-
-def load_data(filename):
-    data = np.loadtxt(filename, delimiter='\t')
-    return data[:, :-1], data[:, -1]  # 返回特征和标签
-
-
-acoustic_data, acoustic_labels = load_data('acoustic_data.txt')
-vibration_data, vibration_labels = load_data('vibration_data.txt')
-
-
-#  2. 特征提取
-
-
-acoustic_features = np.array([extract_acoustic_features(sample) for sample in acoustic_data])
-vibration_features = np.array([extract_vibration_features(sample) for sample in vibration_data])
-
-# 归一化数据
-scaler = StandardScaler()
-acoustic_features = scaler.fit_transform(acoustic_features.reshape(len(acoustic_features), -1)).reshape(acoustic_features.shape)
-vibration_features = scaler.fit_transform(vibration_features.reshape(len(vibration_features), -1)).reshape(vibration_features.shape)
-
-# 数据标签
-labels = to_categorical(acoustic_labels)  # 假设两个数据集的标签一致
-
-# 拆分数据集
-X_train_a, X_test_a, y_train, y_test = train_test_split(acoustic_features, labels, test_size=0.2, random_state=42)
-X_train_v, X_test_v, _, _ = train_test_split(vibration_features, labels, test_size=0.2, random_state=42)
-
-
-#  3. CNN + LSTM 模型
-
-
-def build_cnn_lstm(input_shape):
-    model = Sequential([
-        # CNN 部分
-        TimeDistributed(Conv2D(32, (3,3), activation='relu', padding='same'), input_shape=input_shape),
-        TimeDistributed(MaxPooling2D(pool_size=(2,2))),
-        TimeDistributed(BatchNormalization()),
-        
-        TimeDistributed(Conv2D(64, (3,3), activation='relu', padding='same')),
-        TimeDistributed(MaxPooling2D(pool_size=(2,2))),
-        TimeDistributed(BatchNormalization()),
-        
-        TimeDistributed(Conv2D(128, (3,3), activation='relu', padding='same')),
-        TimeDistributed(MaxPooling2D(pool_size=(2,2))),
-        TimeDistributed(Flatten()),  # 展平
-        
-        # LSTM 部分
-        LSTM(100, return_sequences=True),
-        LSTM(50),
-
-        # 分类层
-        Dense(64, activation='relu'),
-        Dropout(0.5),
-        Dense(labels.shape[1], activation='softmax')
-    ])
-    
-    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-    return model
-
-# 构建模型
-input_shape = (None, acoustic_features.shape[1], acoustic_features.shape[2], 1)  # 时序长度不固定
-model = build_cnn_lstm(input_shape)
-
-
-#  4. 训练模型
-
-
-history = model.fit(
-    X_train_a, y_train,
-    validation_data=(X_test_a, y_test),
-    epochs=20,
-    batch_size=16
-)
-
-# 保存模型
-model.save("cnn_lstm_acoustic_vibration.h5")
-
-
-#  5. 预测
-
-
-def predict_fault(audio_sample, vibration_sample):
-    # 预处理样本
-    audio_feat = extract_acoustic_features(audio_sample)
-    audio_feat = scaler.transform(audio_feat.reshape(1, -1)).reshape(1, *audio_feat.shape, 1)
-    
-    vib_feat = extract_vibration_features(vibration_sample)
-    vib_feat = scaler.transform(vib_feat.reshape(1, -1)).reshape(1, *vib_feat.shape, 1)
-
-    # 加载模型
-    model = tf.keras.models.load_model("cnn_lstm_acoustic_vibration.h5")
-    
-    # 预测
-    pred = model.predict(audio_feat)
-    return np.argmax(pred)
 
+# CNN + LSTM 离心泵故障诊断命令行入口
+#   python 1DCNN_LSTM.py train    训练并保存模型与标准化器（--stream 流式训练）
+#   python 1DCNN_LSTM.py extract  预先提取特征并写入特征缓存
+#   python 1DCNN_LSTM.py predict  对数据文件中的每个样本做诊断（--lite 使用导出的 TFLite 模型）
+#   python 1DCNN_LSTM.py export   导出 TFLite 模型（--int8 训练后量化）
+#
+# 具体实现见 cnn_lstm_features / cnn_lstm_train / cnn_lstm_infer / cnn_lstm_export / cnn_lstm_lite，各子命令只导入自己需要的模块。
+
+
+def cmd_train(args):
+    import cnn_lstm_train
+    if args.stream:
+        cnn_lstm_train.train_streaming(args.acoustic, args.vibration, epochs=args.epochs,
+                                       batch_size=args.batch_size, n_workers=args.workers,
+                                       store_dir=args.store, shard_rows=args.shard_rows,
+                                       model_path=args.model, scaler_path=args.scaler)
+        return
+    cnn_lstm_train.train(args.acoustic, args.vibration, epochs=args.epochs, batch_size=args.batch_size,
+                         n_workers=args.workers, use_cache=not args.no_cache,
+                         model_path=args.model, scaler_path=args.scaler)
+
+
+def cmd_extract(args):
+    import cnn_lstm_features as features
+    acoustic_data, _ = features.load_data(args.acoustic)
+    vibration_data, _ = features.load_data(args.vibration)
+    acoustic_features, vibration_features = features.extract_features(acoustic_data, vibration_data,
+                                                                       n_workers=args.workers)
+    print(f"声学特征: {acoustic_features.shape}, 振动特征: {vibration_features.shape}")
+
+
+def cmd_predict(args):
+    import cnn_lstm_features as features
+
+    audio_samples, labels = features.load_data(args.acoustic)
+    if args.lite:
+        from cnn_lstm_lite import LiteSession
+        session = LiteSession(args.lite_model, args.lite_scaler)
+    else:
+        from cnn_lstm_infer import InferenceSession
+        session = InferenceSession(args.model, args.scaler)
+    preds = np.concatenate([session.predict_batch(audio_samples[start:start + args.batch_size])
+                            for start in range(0, len(audio_samples), args.batch_size)])
+    for i, pred in enumerate(preds):
+        print(f"样本 {i}: 故障类别 {pred}")
+    print(f"准确率: {np.mean(preds == labels):.4f}")
+
+
+def cmd_export(args):
+    import cnn_lstm_export
+    cnn_lstm_export.export_tflite(args.model, args.scaler, out_path=args.lite_model, out_scaler_path=args.lite_scaler,
+                                  int8=args.int8, acoustic_file=args.acoustic,
+                                  calibration_samples=args.calibration_samples, batch_size=args.batch_size)
+
+
+def main():
+    import cnn_lstm_features as features
+
+    parser = argparse.ArgumentParser(description="CNN + LSTM 离心泵故障诊断")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--acoustic', default='acoustic_data.txt', help="声学数据（文本或 .dataset 目录）")
+    common.add_argument('--model', default=features.MODEL_PATH)
+    common.add_argument('--scaler', default=features.SCALER_PATH)
+    common.add_argument('--workers', type=int, default=None, help="特征提取进程数，默认使用全部 CPU 核心")
+    common.add_argument('--lite-model', default=features.LITE_MODEL_PATH)
+    common.add_argument('--lite-scaler', default=features.LITE_SCALER_PATH)
+
+    p = sub.add_parser('train', parents=[common], help="训练模型")
+    p.add_argument('--vibration', default='vibration_data.txt')
+    p.add_argument('--epochs', type=int, default=20)
+    p.add_argument('--batch-size', type=int, default=16)
+    p.add_argument('--no-cache', action='store_true', help="不使用特征缓存")
+    p.add_argument('--stream', action='store_true', help="特征写入磁盘特征库并流式训练（数据集大于内存时使用）")
+    p.add_argument('--store', default=None, help="特征库目录，默认与声学数据同名、后缀为 .features")
+    p.add_argument('--shard-rows', type=int, default=None, help="特征库每个分片的样本数")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser('extract', parents=[common], help="提取特征并写入缓存")
+    p.add_argument('--vibration', default='vibration_data.txt')
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser('predict', parents=[common], help="诊断数据文件中的样本")
+    p.add_argument('--batch-size', type=int, default=64)
+    p.add_argument('--lite', action='store_true', help="使用导出的 TFLite 模型（不需要 TensorFlow）")
+    p.set_defaults(func=cmd_predict)
+
+    p = sub.add_parser('export', parents=[common], help="导出 TFLite 模型")
+    p.add_argument('--int8', action='store_true', help="训练后 int8 量化，用 --acoustic 中的样本校准")
+    p.add_argument('--calibration-samples', type=int, default=200)
+    p.add_argument('--batch-size', type=int, default=1, help="导出模型的固定批大小")
+    p.set_defaults(func=cmd_export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import time
+import queue
+import threading
+from collections import deque, Counter
+from concurrent.futures import Future
+import numpy as np
+
+# 微批推理调度器：所有界面会话的诊断请求进入同一个队列，
+# 后台线程把最多 max_batch_size 个、最多等待 max_wait_ms 毫秒的请求合并成一批，
+# 只调用一次模型，再把结果分发给各自的 Future。
+
+
+class BatchScheduler:
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0, name="scheduler", history=10000):
+        """
+        参数：
+        - predict_fn: 批量预测函数，输入样本列表，返回与之等长的结果序列
+        - max_batch_size: 每批最多样本数
+        - max_wait_ms: 第一个请求到达后最多等待的毫秒数
+        - history: 统计队列延迟时保留的最近请求数
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=history)
+        self._n_requests = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"BatchScheduler-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, sample):
+        """ 提交一个样本，返回 concurrent.futures.Future，结果为该样本的预测值 """
+        if self._closed:
+            raise RuntimeError(f"调度器 {self.name} 已关闭")
+        future = Future()
+        self._queue.put((sample, future, time.perf_counter()))
+        return future
+
+    def predict(self, sample, timeout=None):
+        """ 同步预测一个样本 """
+        return self.submit(sample).result(timeout)
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = item[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # 处理完当前批次后再退出
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # 调用方可能已取消请求
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = list(self.predict_fn([sample for sample, _, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"调度器 {self.name} 的预测函数对 {len(batch)} 个样本返回了 {len(results)} 个结果")
+            except Exception as e:
+                # 一批中任何样本出错，整批的请求都以该异常结束，不会有 Future 一直等不到结果
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._n_requests += len(batch)
+                self._latencies.extend(start - submitted for _, _, submitted in batch)
+
+    def stats(self):
+        """ 批大小与排队延迟（毫秒）统计 """
+        with self._lock:
+            sizes = dict(self._batch_sizes)
+            latencies = np.array(self._latencies) * 1000
+            n_requests = self._n_requests
+        n_batches = sum(sizes.values())
+        result = {
+            'requests': n_requests,
+            'batches': n_batches,
+            'mean_batch_size': n_requests / n_batches if n_batches else 0.0,
+            'max_batch_size': max(sizes) if sizes else 0,
+            'batch_size_histogram': dict(sorted(sizes.items())),
+        }
+        if len(latencies):
+            result.update({
+                'queue_ms_mean': float(latencies.mean()),
+                'queue_ms_p50': float(np.percentile(latencies, 50)),
+                'queue_ms_p95': float(np.percentile(latencies, 95)),
+                'queue_ms_max': float(latencies.max()),
+            })
+        return result
+
+    def format_stats(self):
+        s = self.stats()
+        text = f"[{self.name}] 请求 {s['requests']}，批次 {s['batches']}，平均批大小 {s['mean_batch_size']:.2f}"
+        if 'queue_ms_mean' in s:
+            text += f"，排队延迟 平均 {s['queue_ms_mean']:.2f} ms / p95 {s['queue_ms_p95']:.2f} ms"
+        return text
+
+
+# 进程内共享的调度器，所有会话共用
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(key, factory):
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = factory()
+        return scheduler
+
+
+def get_svm_scheduler(model_name="vibration_svm.pkl", scores=False, **kwargs):
+    """
+    SVM 模型的共享调度器，样本为特征向量；.npz 模型（svm.export_numpy 导出）用纯 NumPy 预测。
+    scores 为 True 时每个结果为 (故障类别, 各类别得分)，见 svm.predict_scores。
+    """
+    if model_name.endswith('.npz'):
+        import svm_numpy as svm
+    else:
+        import svm
+    name = f"svm:{os.path.basename(model_name)}"
+    if scores:
+        return get_scheduler(('svm_scores', os.path.abspath(model_name)), lambda: BatchScheduler(
+            lambda batch: list(zip(*svm.predict_scores(batch, model_name))), name=name + ":scores", **kwargs))
+    return get_scheduler(('svm', os.path.abspath(model_name)), lambda: BatchScheduler(
+        lambda batch: svm.predict_many(batch, model_name), name=name, **kwargs))
+
+
+def get_cnn_lstm_scheduler(lite=False, **kwargs):
+    """ CNN-LSTM 模型的共享调度器，样本为声学信号；lite 为 True 时使用导出的 TFLite 模型 """
+    if lite:
+        import cnn_lstm_lite as session_module
+    else:
+        import cnn_lstm_infer as session_module
+    name = "cnn_lstm_lite" if lite else "cnn_lstm"
+    return get_scheduler((name,), lambda: BatchScheduler(
+        lambda batch: session_module.get_session().predict_batch(batch), name=name, **kwargs))
@@ -0,0 +1,260 @@
+import os
+import glob
+import json
+import hashlib
+import functools
+import numpy as np
+import cnn_lstm_features as features
+
+# CNN + LSTM 的磁盘特征库与流式训练输入（数据集大于内存时使用）：
+#   acoustic_data.features/
+#       acoustic-00000.npy   声学特征分片 (shard_rows, n_mels, n_frames)，float32
+#       vibration-00000.npy  振动特征分片 (shard_rows, n_scales, n_points)，float32
+#       labels-00000.npy     标签分片 (shard_rows,)
+#       meta.json            分片行数、特征形状、提取参数、源数据指纹等元数据（建库完成后写入）
+#       build.json           建库过程中的指纹（完成后删除）
+#
+# 建库时逐分片多进程提取，每个分片直接写入内存映射文件，中断后重新运行会跳过已完成的分片；
+# 指纹（源数据文件的路径 / 大小 / 修改时间或内容摘要、样本数、分片行数、提取参数与版本）
+# 与已有特征库或未完成的建库不一致时，删除全部旧分片重新提取，不会混用不同数据或参数的分片；
+# 标准化器的均值和方差在一次顺序扫描中用 partial_fit 累计；
+# 训练时以 tf.data 按分片读取内存映射：分片顺序和分片内的行顺序每轮打乱，
+# 再经过洗牌缓冲区、分批，标准化在图中完成，预取与模型计算重叠。
+# 内存占用只与分片大小、洗牌缓冲区和批大小有关。
+
+STORE_SUFFIX = '.features'
+STORE_VERSION = 2
+SHARD_ROWS = 2048
+KINDS = ('acoustic', 'vibration')
+KIND_NAMES = {'acoustic': "声学特征", 'vibration': "振动特征"}
+
+
+def store_path(filename):
+    """ 数据文件对应的特征库目录 """
+    stem, _ = os.path.splitext(filename.rstrip('/\\'))
+    return stem + STORE_SUFFIX
+
+
+def _shard_path(store_dir, kind, shard):
+    return os.path.join(store_dir, f"{kind}-{shard:05d}.npy")
+
+
+def _float32(func, sample):
+    return np.asarray(func(sample), dtype=np.float32)
+
+
+def _params():
+    return {'acoustic': features.ACOUSTIC_PARAMS, 'vibration': features.VIBRATION_PARAMS}
+
+
+def source_fingerprint(data):
+    """
+    源数据指纹：内存映射数组用文件路径、大小、修改时间（不读取数据，与 dataset.load_data 判断数据集是否过期的方式一致），
+    内存中的数组用内容摘要。
+    """
+    if isinstance(data, np.memmap) and data.filename:
+        st = os.stat(data.filename)
+        return {'file': os.path.abspath(data.filename), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                'offset': int(data.offset), 'shape': list(data.shape), 'dtype': data.dtype.str}
+    from feature_cache import HASH_BLOCK_BYTES
+    data = np.asarray(data)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{data.dtype.str}{data.shape}".encode('utf-8'))
+    if len(data):
+        step = max(1, HASH_BLOCK_BYTES // max(1, data[0].nbytes))
+        for start in range(0, len(data), step):
+            h.update(memoryview(np.ascontiguousarray(data[start:start + step])).cast('B'))
+    return {'digest': h.hexdigest()}
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _clear_store(store_dir):
+    """ 删除特征库中的全部分片和元数据 """
+    patterns = [f"{kind}-*.npy*" for kind in KINDS + ('labels',)] + ['meta.json', 'build.json']
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(store_dir, pattern)):
+            os.remove(path)
+
+
+def build_store(acoustic_data, vibration_data, labels, store_dir, shard_rows=SHARD_ROWS, n_workers=None):
+    """
+    把整个数据集的特征提取到磁盘特征库，返回 meta。
+
+    参数：
+    - acoustic_data / vibration_data: 样本矩阵 (n_samples, n_points)，可以是内存映射数组
+    - labels: 标签数组 (n_samples,)
+    - store_dir: 特征库目录；已存在且指纹一致时直接复用，否则删除旧分片重新提取
+    - shard_rows: 每个分片的样本数
+    - n_workers: 特征提取进程数
+    """
+    from parallel_extract import parallel_extract
+
+    n_samples = len(acoustic_data)
+    if len(vibration_data) != n_samples or len(labels) != n_samples:
+        raise ValueError("声学数据、振动数据与标签的样本数不一致")
+    params = _params()
+    fingerprint = json.loads(json.dumps({
+        'n_samples': n_samples,
+        'shard_rows': shard_rows,
+        'params': params,
+        'extractor': {kind: features.extractor_info(kind) for kind in KINDS},
+        'sources': {'acoustic': source_fingerprint(acoustic_data), 'vibration': source_fingerprint(vibration_data),
+                    'labels': source_fingerprint(labels)},
+    }))
+
+    meta_path = os.path.join(store_dir, 'meta.json')
+    build_path = os.path.join(store_dir, 'build.json')
+    meta = _read_json(meta_path)
+    if meta is not None and meta.get('version') == STORE_VERSION and meta.get('fingerprint') == fingerprint:
+        print(f"特征库已存在: {store_dir}")
+        return open_store(store_dir)
+    # 只有与本次指纹相同的未完成建库才能续建，其余情况（数据、参数或分片行数变化）清空重建
+    if meta is not None or _read_json(build_path) != fingerprint:
+        if os.path.isdir(store_dir):
+            _clear_store(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    with open(build_path, 'w') as f:
+        json.dump(fingerprint, f, indent=2)
+
+    funcs = {
+        'acoustic': functools.partial(features.extract_acoustic_features_batch, dtype=np.float32,
+                                      **params['acoustic']),
+        'vibration': functools.partial(_float32, functools.partial(features.extract_vibration_features,
+                                                                   **params['vibration'])),
+    }
+    sources = {'acoustic': acoustic_data, 'vibration': vibration_data}
+    n_shards = (n_samples + shard_rows - 1) // shard_rows
+    for shard in range(n_shards):
+        start, stop = shard * shard_rows, min((shard + 1) * shard_rows, n_samples)
+        for kind in KINDS:
+            path = _shard_path(store_dir, kind, shard)
+            if os.path.exists(path):
+                continue
+            # 先写临时文件，写完再改名，中断后不会留下不完整的分片
+            parallel_extract(funcs[kind], sources[kind][start:stop], out_path=path + '.tmp',
+                             n_workers=n_workers, name=f"{KIND_NAMES[kind]} 分片 {shard + 1}/{n_shards}",
+                             batch=kind == 'acoustic')
+            os.replace(path + '.tmp', path)
+        np.save(_shard_path(store_dir, 'labels', shard), np.asarray(labels[start:stop]))
+
+    first = {kind: np.load(_shard_path(store_dir, kind, 0), mmap_mode='r') for kind in KINDS}
+    meta = {
+        'version': STORE_VERSION,
+        'n_samples': n_samples,
+        'shard_rows': shard_rows,
+        'n_shards': n_shards,
+        'shapes': {kind: list(first[kind].shape[1:]) for kind in KINDS},
+        'params': params,
+        'fingerprint': fingerprint,
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.remove(build_path)
+    return open_store(store_dir)
+
+
+def open_store(store_dir):
+    """ 读取特征库元数据 """
+    with open(os.path.join(store_dir, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"不支持的特征库版本: {meta.get('version')}")
+    meta['dir'] = store_dir
+    return meta
+
+
+def load_shard(meta, kind, shard):
+    """ 以内存映射方式打开一个分片，kind 为 'acoustic'、'vibration' 或 'labels' """
+    return np.load(_shard_path(meta['dir'], kind, shard), mmap_mode='r')
+
+
+def fit_scalers(meta, chunk_rows=256):
+    """
+    顺序扫描一遍特征库，用 partial_fit 累计均值和方差，
+    返回与一次性 fit 等价的 (acoustic_scaler, vibration_scaler)。
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    scalers = {kind: StandardScaler() for kind in KINDS}
+    for shard in range(meta['n_shards']):
+        for kind in KINDS:
+            data = load_shard(meta, kind, shard)
+            for start in range(0, len(data), chunk_rows):
+                chunk = np.asarray(data[start:start + chunk_rows])
+                scalers[kind].partial_fit(chunk.reshape(len(chunk), -1))
+    return scalers['acoustic'], scalers['vibration']
+
+
+def split_mask(n_samples, test_size=0.2, seed=42):
+    """ 按样本随机划分验证集，返回布尔掩码（True 为验证样本） """
+    return np.random.default_rng(seed).random(n_samples) < test_size
+
+
+def make_dataset(meta, scaler, n_classes, rows=None, kind='acoustic', batch_size=16, shuffle=True,
+                 shuffle_buffer=4096, block_rows=64, seed=None):
+    """
+    从特征库流式读取 (标准化后的特征, one-hot 标签) 的 tf.data.Dataset，特征批形状为 (batch, n_mels, n_frames, 1)。
+
+    参数：
+    - meta: open_store / build_store 返回的元数据
+    - scaler: 该特征的 StandardScaler，标准化在图中按批完成
+    - n_classes: 类别数
+    - rows: 布尔掩码 (n_samples,)，只使用为 True 的样本；None 表示全部样本
+    - shuffle: 每轮打乱分片顺序和分片内行顺序，并经过 shuffle_buffer 大小的洗牌缓冲区
+    - block_rows: 每次从内存映射读取的行数（块内按行号排序读取，减少随机 I/O）
+    """
+    import tensorflow as tf
+
+    shape = tuple(meta['shapes'][kind])
+    shard_rows = meta['shard_rows']
+
+    def rows_of(shard):
+        start = shard * shard_rows
+        stop = min(start + shard_rows, meta['n_samples'])
+        index = np.arange(stop - start)
+        return index if rows is None else index[np.asarray(rows[start:stop], dtype=bool)]
+
+    shards = [shard for shard in range(meta['n_shards']) if len(rows_of(shard))]
+
+    def read_shard(shard):
+        shard = int(shard)
+        data, labels = load_shard(meta, kind, shard), load_shard(meta, 'labels', shard)
+        index = rows_of(shard)
+        if shuffle:
+            index = np.random.default_rng().permutation(index)
+        for start in range(0, len(index), block_rows):
+            block = np.sort(index[start:start + block_rows])
+            yield np.asarray(data[block], dtype=np.float32), np.asarray(labels[block], dtype=np.int64)
+
+    def shard_dataset(shard):
+        return tf.data.Dataset.from_generator(
+            read_shard, args=(shard,),
+            output_signature=(tf.TensorSpec((None,) + shape, tf.float32), tf.TensorSpec((None,), tf.int64)))
+
+    dataset = tf.data.Dataset.from_tensor_slices(np.array(shards, dtype=np.int64))
+    if shuffle:
+        dataset = dataset.shuffle(len(shards), seed=seed, reshuffle_each_iteration=True)
+    # 同时读取多个分片，内存映射的读取与特征标准化、模型计算并行
+    dataset = dataset.interleave(shard_dataset, cycle_length=min(4, max(1, len(shards))),
+                                 num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    dataset = dataset.unbatch()
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    mean = tf.constant(scaler.mean_.reshape(shape), tf.float32)
+    scale = tf.constant(scaler.scale_.reshape(shape), tf.float32)
+
+    def prepare(x, y):
+        # 标准化并加上通道轴：(batch, n_mels, n_frames) -> (batch, n_mels, n_frames, 1)，与 build_cnn_lstm 的输入一致
+        return tf.expand_dims((x - mean) / scale, -1), tf.one_hot(y, n_classes)
+
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(prepare, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,95 @@
+import numpy as np
+import joblib
+import cnn_lstm_features as features
+
+# CNN + LSTM 模型导出为 TFLite，供不安装 TensorFlow 的进程推理（见 cnn_lstm_lite）：
+#   cnn_lstm_acoustic_vibration.tflite       模型（可选训练后 int8 量化）
+#   cnn_lstm_acoustic_vibration.scaler.npz   声学标准化器的 mean / scale 与特征参数，推理时不需要 sklearn
+#
+# int8 量化用一批真实样本的特征校准各层激活范围；输入输出仍为 float32，调用方式不变。
+# 转换前先把变量固化为常量（否则 LSTM 循环中的变量读取在解释器中无法执行）；
+# 校准器不支持融合 LSTM 算子，int8 量化时 LSTM 层按时间步展开（时间步数固定且很少）。
+
+
+def calibration_features(acoustic_file, scaler, n_samples=200, sr=16000, n_mels=128, seed=0):
+    """ 从数据文件随机抽取 n_samples 个样本，返回标准化后的模型输入 (n, n_mels, n_frames, 1)，float32 """
+    audio_data, _ = features.load_data(acoustic_file)
+    n = min(n_samples, len(audio_data))
+    rows = np.sort(np.random.default_rng(seed).choice(len(audio_data), n, replace=False))
+    feats = features.extract_acoustic_features_batch(np.asarray(audio_data[rows]), sr=sr, n_mels=n_mels,
+                                                      dtype=np.float32)
+    feats = scaler.transform(feats.reshape(n, -1))
+    return feats.reshape(n, n_mels, -1, 1).astype(np.float32)
+
+
+def save_scaler(scaler, path=features.LITE_SCALER_PATH, sr=16000, n_mels=128):
+    """ 保存标准化参数和特征参数（纯 NumPy 格式） """
+    np.savez(path, mean=scaler.mean_.astype(np.float32), scale=scaler.scale_.astype(np.float32),
+             sr=sr, n_mels=n_mels)
+
+
+def _frozen_function(model, spec, unroll=False):
+    """ 模型的推理函数，变量固化为常量；unroll 为 True 时 LSTM 层按时间步展开（权重不变） """
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    if unroll:
+        def clone_layer(layer):
+            config = layer.get_config()
+            if isinstance(layer, tf.keras.layers.LSTM):
+                config['unroll'] = True
+            return layer.__class__.from_config(config)
+
+        unrolled = tf.keras.models.clone_model(model, clone_function=clone_layer)
+        unrolled.set_weights(model.get_weights())
+        model = unrolled
+    predict = tf.function(lambda x: model(x, training=False), input_signature=[spec])
+    return convert_variables_to_constants_v2(predict.get_concrete_function())
+
+
+def export_tflite(model_path=features.MODEL_PATH, scaler_path=features.SCALER_PATH,
+                  out_path=features.LITE_MODEL_PATH, out_scaler_path=features.LITE_SCALER_PATH,
+                  int8=False, acoustic_file=None, calibration_samples=200, sr=16000, n_mels=128, batch_size=1):
+    """
+    把 Keras 模型转换为 TFLite 并保存，返回模型文件大小（字节）。
+
+    参数：
+    - int8: 训练后 int8 量化（权重与激活），需要 acoustic_file 提供校准样本
+    - acoustic_file: 校准用的声学数据文件（文本或 .dataset 目录）
+    - calibration_samples: 校准样本数
+    - batch_size: 导出模型的固定批大小（LSTM 只有在形状全部固定时才能转换为 TFLite 的融合 LSTM 算子，
+                  推理时 LiteSession 按该批大小分块，不足的部分补零）
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    acoustic_scaler, _ = joblib.load(scaler_path)
+    feature_shape = (n_mels, acoustic_scaler.n_features_in_ // n_mels)
+
+    # 单个样本 (n_mels, n_frames, 1)，与 InferenceSession 相同；批大小固定
+    input_shape = tuple(model.inputs[0].shape[1:])
+    if input_shape != (*feature_shape, 1):
+        raise ValueError(f"模型输入形状 {input_shape} 与标准化器的特征形状 {feature_shape} 不一致，请重新训练")
+    spec = tf.TensorSpec((batch_size, *input_shape), tf.float32)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([_frozen_function(model, spec, unroll=int8)])
+
+    if int8:
+        if acoustic_file is None:
+            raise ValueError("int8 量化需要校准数据（acoustic_file）")
+        samples = calibration_features(acoustic_file, acoustic_scaler, calibration_samples, sr, n_mels)
+
+        def representative_dataset():
+            for start in range(0, len(samples) - batch_size + 1, batch_size):
+                yield [samples[start:start + batch_size]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        # LSTM 中个别算子没有 int8 实现时保留浮点，而不是转换失败
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS]
+
+    lite_model = converter.convert()
+    with open(out_path, 'wb') as f:
+        f.write(lite_model)
+    save_scaler(acoustic_scaler, out_scaler_path, sr=sr, n_mels=n_mels)
+    print(f"已导出 {out_path}（{len(lite_model) / 2 ** 20:.2f} MB{'，int8 量化' if int8 else ''}）")
+    return len(lite_model)
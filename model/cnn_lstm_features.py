@@ -0,0 +1,129 @@
+import functools
+import numpy as np
+import librosa
+
+# CNN + LSTM 模型的数据与特征提取（训练和推理共用）
+
+MODEL_PATH = "cnn_lstm_acoustic_vibration.h5"
+SCALER_PATH = "cnn_lstm_scalers.pkl"
+LITE_MODEL_PATH = "cnn_lstm_acoustic_vibration.tflite"
+LITE_SCALER_PATH = "cnn_lstm_acoustic_vibration.scaler.npz"
+
+ACOUSTIC_PARAMS = {'sr': 16000, 'n_mels': 128}
+N_FFT = 2048
+HOP_LENGTH = 512
+BATCH_BYTES = 64 * 2 ** 20
+VIBRATION_PARAMS = {'wavelet': 'morl', 'max_scale': 64}
+
+# 特征提取版本号：修改提取函数调用的辅助代码（fast_cwt、梅尔滤波器组、dB 转换等）时加一，
+# 特征缓存和特征库中的旧结果随之失效（提取函数本身的源码变化会被自动检测）
+EXTRACTOR_VERSION = 1
+
+
+def extractor_info(kind):
+    """ 参与缓存键的提取版本信息：版本号和不通过参数传入的模块常量 """
+    if kind == 'acoustic':
+        return {'version': EXTRACTOR_VERSION, 'n_fft': N_FFT, 'hop_length': HOP_LENGTH}
+    return {'version': EXTRACTOR_VERSION}
+
+
+# 声学数据特征提取（梅尔频谱）
+def extract_acoustic_features(audio_data, sr=16000, n_mels=128):
+    mel_spectrogram = librosa.feature.melspectrogram(y=audio_data, sr=sr, n_mels=n_mels)
+    mel_db = librosa.power_to_db(mel_spectrogram, ref=np.max)  # 转换为 dB
+    return mel_db
+
+@functools.lru_cache(maxsize=8)
+def mel_filterbank(sr, n_fft, n_mels):
+    """ 梅尔滤波器组 (n_mels, n_fft // 2 + 1)，与 librosa.feature.melspectrogram 内部使用的相同，按参数缓存 """
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+
+@functools.lru_cache(maxsize=8)
+def stft_window(n_fft):
+    """ 周期汉宁窗（librosa.stft 的默认窗） """
+    return librosa.filters.get_window('hann', n_fft, fftbins=True)
+
+
+def extract_acoustic_features_batch(audio_data, sr=16000, n_mels=128, dtype=np.float64, out=None):
+    """
+    批量计算梅尔频谱 dB，结果与逐样本调用 extract_acoustic_features 相同，形状 (n_samples, n_mels, n_frames)。
+
+    整个样本矩阵一起分帧、加窗、做 FFT，梅尔滤波器组只构建一次、以一次矩阵乘法作用于所有帧，
+    dB 转换原地完成。按 BATCH_BYTES 分块处理，中间数组的大小与样本数无关。
+
+    参数：
+    - audio_data: 样本矩阵 (n_samples, n_points)，可以是内存映射数组
+    - dtype: 输出类型，np.float32 可将内存减半
+    - out: 可选的输出数组（例如内存映射文件），形状 (n_samples, n_mels, n_frames)
+    """
+    n_samples, n_points = np.shape(audio_data)
+    n_frames = 1 + n_points // HOP_LENGTH
+    mel_basis = mel_filterbank(sr, N_FFT, n_mels).astype(dtype)
+    window = stft_window(N_FFT)
+    if out is None:
+        out = np.empty((n_samples, n_mels, n_frames), dtype=dtype)
+
+    # 每块的帧矩阵 (rows, n_frames, N_FFT) 不超过 BATCH_BYTES
+    step = max(1, BATCH_BYTES // (n_frames * N_FFT * 8))
+    for start in range(0, n_samples, step):
+        y = np.asarray(audio_data[start:start + step], dtype=dtype)
+        # center=True：两端各补 N_FFT // 2 个零（librosa 默认 pad_mode='constant'）
+        y = np.pad(y, ((0, 0), (N_FFT // 2, N_FFT // 2)))
+        frames = np.lib.stride_tricks.sliding_window_view(y, N_FFT, axis=1)[:, ::HOP_LENGTH]
+        spectrum = np.abs(np.fft.rfft(frames * window, axis=-1).astype(np.result_type(dtype, np.complex64)))
+        power = np.square(spectrum, out=spectrum)
+        mel = np.matmul(mel_basis, power.transpose(0, 2, 1))
+        out[start:start + len(y)] = power_to_db_inplace(mel)
+    return out
+
+
+def power_to_db_inplace(S, amin=1e-10, top_db=80.0):
+    """ 原地计算 librosa.power_to_db(S, ref=np.max)，S 形状 (n_samples, ...)，每个样本以自身最大值为参考 """
+    axes = tuple(range(1, S.ndim))
+    ref = np.maximum(amin, S.max(axis=axes, keepdims=True))
+    np.maximum(S, amin, out=S)
+    np.log10(S, out=S)
+    S *= 10.0
+    S -= 10.0 * np.log10(ref)
+    np.maximum(S, S.max(axis=axes, keepdims=True) - top_db, out=S)
+    return S
+
+
+# 振动数据特征提取（小波变换 CWT）
+def extract_vibration_features(vibration_data, wavelet='morl', max_scale=64):
+    import fast_cwt  # 推理只用声学特征，scipy / pywt 到这里才导入
+    scales = np.arange(1, max_scale)  # 64 级小波变换
+    coeffs, _ = fast_cwt.cwt(vibration_data, scales, wavelet=wavelet)  # CWT 变换（FFT 滤波器组）
+    return np.abs(coeffs)  # 取绝对值
+
+
+def load_data(filename):
+    import dataset
+    return dataset.load_data(filename)  # 返回特征和标签（二进制数据集内存映射，文本作为回退）
+
+
+def extract_features(acoustic_data, vibration_data, n_workers=None, use_cache=True):
+    """
+    多进程提取整个数据集的声学与振动特征，返回 (acoustic_features, vibration_features)。
+
+    use_cache 为 True 时结果写入特征缓存，样本与提取参数不变时直接读取。
+    """
+    from parallel_extract import parallel_extract
+    from feature_cache import FeatureCache
+
+    jobs = [
+        # 声学特征按块批量提取（一次 FFT、一次滤波器组矩阵乘法），振动特征逐样本提取
+        ('acoustic', extract_acoustic_features_batch, acoustic_data, ACOUSTIC_PARAMS, "声学特征", True),
+        ('vibration', extract_vibration_features, vibration_data, VIBRATION_PARAMS, "振动特征", False),
+    ]
+    feature_cache = FeatureCache() if use_cache else None
+    results = []
+    for kind, func, data, params, name, batch in jobs:
+        compute = functools.partial(parallel_extract, n_workers=n_workers, name=name, batch=batch)
+        if feature_cache is not None:
+            results.append(feature_cache.get_or_compute(func, data, params, compute=compute,
+                                                        version=extractor_info(kind)))
+        else:
+            results.append(compute(functools.partial(func, **params), data))
+    return tuple(results)
@@ -0,0 +1,61 @@
+import numpy as np
+import joblib
+import cnn_lstm_features as features
+
+# CNN + LSTM 模型推理：导入本模块不会导入 TensorFlow，第一次创建会话时才加载
+
+
+class InferenceSession:
+    """
+    常驻推理会话：模型和标准化器只加载一次，预测函数编译为静态图并用假数据预热，
+    之后每次预测只剩特征提取和一次图执行。
+    """
+
+    def __init__(self, model_path=features.MODEL_PATH, scaler_path=features.SCALER_PATH,
+                 sr=16000, n_mels=128):
+        import tensorflow as tf
+        self._tf = tf
+        self.sr = sr
+        self.n_mels = n_mels
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+        self.acoustic_scaler, self.vibration_scaler = joblib.load(scaler_path)
+
+        # 特征形状由训练时的标准化器确定：(n_mels, n_frames)；模型输入为 (batch, n_mels, n_frames, 1)
+        self.feature_shape = (n_mels, self.acoustic_scaler.n_features_in_ // n_mels)
+        input_shape = tuple(self.model.inputs[0].shape[1:])
+        if input_shape != (*self.feature_shape, 1):
+            raise ValueError(f"模型输入形状 {input_shape} 与标准化器的特征形状 {self.feature_shape} 不一致，请重新训练")
+        spec = tf.TensorSpec((None, *input_shape), tf.float32)
+        self._predict = tf.function(lambda x: self.model(x, training=False), input_signature=[spec])
+        self.warmup()
+
+    def warmup(self, batch_size=1):
+        """ 用全零输入触发图构建，避免第一次真实预测承担编译开销 """
+        self._predict(self._tf.zeros((batch_size, *self.feature_shape, 1), self._tf.float32))
+
+    def preprocess(self, audio_samples):
+        feats = features.extract_acoustic_features_batch(np.asarray(audio_samples), sr=self.sr, n_mels=self.n_mels)
+        feats = self.acoustic_scaler.transform(feats.reshape(len(feats), -1))
+        return feats.reshape(len(feats), *self.feature_shape, 1).astype(np.float32)
+
+    def predict_proba(self, audio_samples):
+        """ 批量预测各类别概率，audio_samples 形状 (n_samples, n_points) """
+        return self._predict(self._tf.constant(self.preprocess(audio_samples))).numpy()
+
+    def predict_batch(self, audio_samples, vibration_samples=None):
+        """ 批量预测故障类别（与训练一致，模型只使用声学特征，振动样本目前不参与预测） """
+        return np.argmax(self.predict_proba(audio_samples), axis=1)
+
+
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        _session = InferenceSession()
+    return _session
+
+
+def predict_fault(audio_sample, vibration_sample):
+    return get_session().predict_batch([audio_sample], [vibration_sample])[0]
@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import cnn_lstm_features as features
+
+# CNN + LSTM 的 TFLite 推理（模型由 cnn_lstm_export 导出）：
+# 优先使用 tflite_runtime / ai_edge_litert（几 MB，不依赖 TensorFlow），都未安装时回退到 tf.lite；
+# 标准化参数从 .npz 读取，不导入 sklearn。接口与 cnn_lstm_infer 相同。
+
+
+def _interpreter(model_path, num_threads):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class LiteSession:
+    """
+    常驻 TFLite 推理会话：解释器和标准化参数只加载一次。
+    导出的模型批大小固定（见 cnn_lstm_export），任意数量的样本按该批大小分块执行，最后一块补零。
+    """
+
+    def __init__(self, model_path=features.LITE_MODEL_PATH, scaler_path=features.LITE_SCALER_PATH,
+                 num_threads=None):
+        with np.load(scaler_path) as params:
+            self.mean = params['mean']
+            self.scale = params['scale']
+            self.sr = int(params['sr'])
+            self.n_mels = int(params['n_mels'])
+        self.feature_shape = (self.n_mels, len(self.mean) // self.n_mels)
+
+        self.interpreter = _interpreter(model_path, num_threads or os.cpu_count())
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        if tuple(self._input['shape'][1:]) != (*self.feature_shape, 1):
+            raise ValueError(f"{model_path} 的输入形状 {tuple(self._input['shape'][1:])} 与特征形状 {self.feature_shape} 不一致")
+        self.batch_size = int(self._input['shape'][0])
+        self.interpreter.allocate_tensors()
+
+    def preprocess(self, audio_samples):
+        feats = features.extract_acoustic_features_batch(np.asarray(audio_samples), sr=self.sr, n_mels=self.n_mels,
+                                                         dtype=np.float32)
+        feats = (feats.reshape(len(feats), -1) - self.mean) / self.scale
+        return feats.reshape(len(feats), *self.feature_shape, 1).astype(np.float32)
+
+    def predict_proba(self, audio_samples):
+        """ 批量预测各类别概率，audio_samples 形状 (n_samples, n_points) """
+        x = self.preprocess(audio_samples)
+        # 量化输入输出（inference_input_type=int8 导出的模型）按量化参数换算
+        scale, zero_point = self._input['quantization']
+        if self._input['dtype'] != np.float32:
+            x = np.round(x / scale + zero_point).astype(self._input['dtype'])
+        n = len(x)
+        if n % self.batch_size:
+            x = np.concatenate([x, np.zeros((self.batch_size - n % self.batch_size, *x.shape[1:]), x.dtype)])
+        outputs = []
+        for start in range(0, len(x), self.batch_size):
+            self.interpreter.set_tensor(self._input['index'], x[start:start + self.batch_size])
+            self.interpreter.invoke()
+            outputs.append(self.interpreter.get_tensor(self._output['index']))
+        proba = np.concatenate(outputs)[:n]
+        scale, zero_point = self._output['quantization']
+        if self._output['dtype'] != np.float32:
+            proba = (proba.astype(np.float32) - zero_point) * scale
+        return proba
+
+    def predict_batch(self, audio_samples, vibration_samples=None):
+        """ 批量预测故障类别（与 cnn_lstm_infer 一致，振动样本目前不参与预测） """
+        return np.argmax(self.predict_proba(audio_samples), axis=1)
+
+
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        _session = LiteSession()
+    return _session
+
+
+def predict_fault(audio_sample, vibration_sample):
+    return get_session().predict_batch([audio_sample], [vibration_sample])[0]
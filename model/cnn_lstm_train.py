@@ -0,0 +1,144 @@
+import numpy as np
+import joblib
+import cnn_lstm_features as features
+
+# CNN + LSTM 模型训练（TensorFlow 在调用时才导入）
+
+
+def build_cnn_lstm(input_shape, n_classes):
+    """
+    input_shape 为单个样本的形状 (n_mels, n_frames, 1)：
+    卷积层提取局部时频特征，池化后把帧轴作为时间步、每帧的梅尔方向特征展平后送入 LSTM。
+    """
+    from tensorflow.keras import Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Conv2D, MaxPooling2D, Dense, LSTM, Permute, Reshape
+    from tensorflow.keras.layers import Dropout, BatchNormalization
+
+    n_mels, n_frames = input_shape[0], input_shape[1]
+    # 三次 2x2 池化（padding='same'，向上取整）后的梅尔数与帧数
+    pooled_mels, pooled_frames = n_mels, n_frames
+    for _ in range(3):
+        pooled_mels, pooled_frames = (pooled_mels + 1) // 2, (pooled_frames + 1) // 2
+
+    model = Sequential([
+        Input(shape=input_shape),
+
+        # CNN 部分
+        Conv2D(32, (3,3), activation='relu', padding='same'),
+        MaxPooling2D(pool_size=(2,2), padding='same'),
+        BatchNormalization(),
+
+        Conv2D(64, (3,3), activation='relu', padding='same'),
+        MaxPooling2D(pool_size=(2,2), padding='same'),
+        BatchNormalization(),
+
+        Conv2D(128, (3,3), activation='relu', padding='same'),
+        MaxPooling2D(pool_size=(2,2), padding='same'),
+
+        # (梅尔, 帧, 通道) -> (帧, 梅尔 * 通道)：帧轴作为 LSTM 的时间步
+        Permute((2, 1, 3)),
+        Reshape((pooled_frames, pooled_mels * 128)),
+
+        # LSTM 部分
+        LSTM(100, return_sequences=True),
+        LSTM(50),
+
+        # 分类层
+        Dense(64, activation='relu'),
+        Dropout(0.5),
+        Dense(n_classes, activation='softmax')
+    ])
+
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def train(acoustic_file='acoustic_data.txt', vibration_file='vibration_data.txt', epochs=20, batch_size=16,
+          n_workers=None, use_cache=True, model_path=features.MODEL_PATH, scaler_path=features.SCALER_PATH):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.utils import to_categorical
+
+    #  1. 数据处理
+    acoustic_data, acoustic_labels = features.load_data(acoustic_file)
+    vibration_data, vibration_labels = features.load_data(vibration_file)
+
+    #  2. 特征提取
+    acoustic_features, vibration_features = features.extract_features(
+        acoustic_data, vibration_data, n_workers=n_workers, use_cache=use_cache)
+
+    # 归一化数据（两种特征各用一个标准化器，训练后与模型一起保存）
+    acoustic_scaler = StandardScaler()
+    vibration_scaler = StandardScaler()
+    acoustic_features = acoustic_scaler.fit_transform(acoustic_features.reshape(len(acoustic_features), -1)).reshape(acoustic_features.shape)
+    vibration_features = vibration_scaler.fit_transform(vibration_features.reshape(len(vibration_features), -1)).reshape(vibration_features.shape)
+
+    # 模型输入为 (n_mels, n_frames, 1)，加上通道轴
+    acoustic_features = acoustic_features[..., np.newaxis].astype(np.float32)
+
+    # 数据标签
+    labels = to_categorical(acoustic_labels)  # 假设两个数据集的标签一致
+
+    # 拆分数据集
+    X_train_a, X_test_a, y_train, y_test = train_test_split(acoustic_features, labels, test_size=0.2, random_state=42)
+    X_train_v, X_test_v, _, _ = train_test_split(vibration_features, labels, test_size=0.2, random_state=42)
+
+    #  3. CNN + LSTM 模型
+    input_shape = acoustic_features.shape[1:]  # (n_mels, n_frames, 1)
+    model = build_cnn_lstm(input_shape, labels.shape[1])
+
+    #  4. 训练模型
+    history = model.fit(
+        X_train_a, y_train,
+        validation_data=(X_test_a, y_test),
+        epochs=epochs,
+        batch_size=batch_size
+    )
+
+    # 保存模型和标准化器
+    model.save(model_path)
+    joblib.dump((acoustic_scaler, vibration_scaler), scaler_path)
+    return model, history
+
+
+def train_streaming(acoustic_file='acoustic_data.txt', vibration_file='vibration_data.txt', epochs=20,
+                    batch_size=16, n_workers=None, store_dir=None, shard_rows=None,
+                    model_path=features.MODEL_PATH, scaler_path=features.SCALER_PATH):
+    """
+    与 train 相同，但特征先写入磁盘特征库，训练时流式读取，数据集可以远大于内存。
+
+    样本数据应为二进制数据集（.dataset 目录，见 dataset.py），文本文件会被整体读入内存。
+    """
+    import cnn_lstm_data as data
+
+    #  1. 数据处理
+    acoustic_data, acoustic_labels = features.load_data(acoustic_file)
+    vibration_data, _ = features.load_data(vibration_file)
+
+    #  2. 特征提取（逐分片写入特征库，已完成的分片直接复用）
+    store_dir = store_dir or data.store_path(acoustic_file)
+    meta = data.build_store(acoustic_data, vibration_data, acoustic_labels, store_dir,
+                            shard_rows=shard_rows or data.SHARD_ROWS, n_workers=n_workers)
+
+    # 归一化参数：顺序扫描一遍特征库累计
+    acoustic_scaler, vibration_scaler = data.fit_scalers(meta)
+
+    # 拆分数据集
+    n_classes = int(np.max(acoustic_labels)) + 1
+    val_rows = data.split_mask(meta['n_samples'], test_size=0.2, seed=42)
+    train_set = data.make_dataset(meta, acoustic_scaler, n_classes, rows=~val_rows, batch_size=batch_size)
+    val_set = data.make_dataset(meta, acoustic_scaler, n_classes, rows=val_rows, batch_size=batch_size,
+                                shuffle=False)
+
+    #  3. CNN + LSTM 模型
+    input_shape = (*meta['shapes']['acoustic'], 1)  # (n_mels, n_frames, 1)，make_dataset 加上通道轴
+    model = build_cnn_lstm(input_shape, n_classes)
+
+    #  4. 训练模型
+    history = model.fit(train_set, validation_data=val_set, epochs=epochs)
+
+    # 保存模型和标准化器
+    model.save(model_path)
+    joblib.dump((acoustic_scaler, vibration_scaler), scaler_path)
+    return model, history
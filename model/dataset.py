@@ -0,0 +1,158 @@
+import os
+import json
+import argparse
+import numpy as np
+
+# 二进制数据集格式（一次转换，之后内存映射读取）：
+#   acoustic_data.dataset/
+#       samples.npy   样本矩阵 (n_samples, n_points)
+#       labels.npy    标签数组 (n_samples,)
+#       meta.json     dtype / shape 等元数据
+STORE_SUFFIX = '.dataset'
+STORE_VERSION = 1
+
+
+def store_path(filename):
+    """ 文本数据文件对应的二进制数据集目录 """
+    stem, _ = os.path.splitext(filename)
+    return stem + STORE_SUFFIX
+
+
+def _data_lines(f):
+    """ 逐行读取文本数据，跳过空行和注释行（与 np.loadtxt 行为一致） """
+    for line in f:
+        stripped = line.strip()
+        if stripped and not stripped.startswith('#'):
+            yield line
+
+
+def convert_to_store(filename, out_dir=None, dtype=np.float64, chunk_rows=10000):
+    """
+    将制表符分隔的文本数据（最后一列为标签）转换为二进制数据集。
+
+    参数：
+    - filename: 文本数据文件，如 'acoustic_data.txt'
+    - out_dir: 输出目录，默认与文本文件同名、后缀为 .dataset
+    - dtype: 样本矩阵的数据类型，float32 可将体积减半
+    - chunk_rows: 每次解析的行数，内存占用只与该值有关
+    """
+    out_dir = out_dir or store_path(filename)
+    dtype = np.dtype(dtype)
+
+    # 第一遍：统计行数与列数
+    n_rows, n_cols = 0, None
+    with open(filename, 'r') as f:
+        for line in _data_lines(f):
+            if n_cols is None:
+                n_cols = len(line.rstrip('\r\n').split('\t'))
+            n_rows += 1
+    if n_cols is None or n_cols < 2:
+        raise ValueError(f"{filename} 中没有可用的数据行")
+
+    # 先写入临时目录，完成后再替换，避免留下不完整的数据集
+    tmp_dir = out_dir + '.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+    samples = np.lib.format.open_memmap(os.path.join(tmp_dir, 'samples.npy'), mode='w+',
+                                        dtype=dtype, shape=(n_rows, n_cols - 1))
+    labels = np.lib.format.open_memmap(os.path.join(tmp_dir, 'labels.npy'), mode='w+',
+                                       dtype=np.float64, shape=(n_rows,))
+
+    # 第二遍：分块解析并写入
+    row = 0
+    with open(filename, 'r') as f:
+        chunk = []
+        for line in _data_lines(f):
+            chunk.append(line)
+            if len(chunk) == chunk_rows:
+                row = _write_chunk(chunk, samples, labels, row)
+                chunk = []
+        if chunk:
+            row = _write_chunk(chunk, samples, labels, row)
+    samples.flush()
+    labels.flush()
+    del samples, labels
+
+    meta = {
+        'version': STORE_VERSION,
+        'source': os.path.basename(filename),
+        'n_samples': n_rows,
+        'n_points': n_cols - 1,
+        'dtype': dtype.str,
+        'label_dtype': np.dtype(np.float64).str,
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if os.path.isdir(out_dir):
+        for name in os.listdir(out_dir):
+            os.remove(os.path.join(out_dir, name))
+        os.rmdir(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+
+def _write_chunk(lines, samples, labels, row):
+    data = np.loadtxt(lines, delimiter='\t', ndmin=2)
+    if data.shape[1] != samples.shape[1] + 1:
+        raise ValueError(f"第 {row + 1} 行附近列数不一致: {data.shape[1]} != {samples.shape[1] + 1}")
+    n = len(data)
+    samples[row:row + n] = data[:, :-1]
+    labels[row:row + n] = data[:, -1]
+    return row + n
+
+
+def open_store(path):
+    """ 以内存映射方式打开二进制数据集，返回 (samples, labels)，只有访问到的行才会被读取 """
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"不支持的数据集版本: {meta.get('version')}")
+
+    samples = np.load(os.path.join(path, 'samples.npy'), mmap_mode='r')
+    labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+    if samples.shape != (meta['n_samples'], meta['n_points']) or len(labels) != meta['n_samples']:
+        raise ValueError(f"数据集 {path} 与元数据不一致")
+    return samples, labels
+
+
+def fresh_store(filename):
+    """ 文本数据文件对应的二进制数据集存在且不旧于文本文件时返回其目录，否则返回 None """
+    path = store_path(filename)
+    if os.path.isdir(path) and (not os.path.exists(filename)
+                                or os.path.getmtime(path) >= os.path.getmtime(filename)):
+        return path
+    return None
+
+
+def load_data(filename):
+    """
+    加载数据，返回 (特征, 标签)。
+
+    优先使用二进制数据集（filename 本身是 .dataset 目录，或同名 .dataset 目录存在且不旧于文本文件），
+    否则回退到 np.loadtxt 解析文本。
+    """
+    if os.path.isdir(filename):
+        return open_store(filename)
+
+    path = fresh_store(filename)
+    if path is not None:
+        return open_store(path)
+
+    data = np.loadtxt(filename, delimiter='\t')
+    return data[:, :-1], data[:, -1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将文本数据转换为内存映射的二进制数据集")
+    parser.add_argument('files', nargs='+', help="制表符分隔的数据文件，最后一列为标签")
+    parser.add_argument('--dtype', default='float64', choices=['float32', 'float64'], help="样本数据类型")
+    parser.add_argument('--chunk-rows', type=int, default=10000, help="每次解析的行数")
+    args = parser.parse_args()
+
+    for filename in args.files:
+        out_dir = convert_to_store(filename, dtype=args.dtype, chunk_rows=args.chunk_rows)
+        print(f"{filename} -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import functools
+import threading
+from collections import namedtuple, OrderedDict
+import numpy as np
+import pywt
+from scipy.fft import next_fast_len
+
+# 基于 FFT 的连续小波变换（结果与 pywt.cwt 一致）
+#
+# pywt.cwt 对每个尺度单独重建小波并做一次卷积；这里把所有尺度的小波核预先变换到频域并缓存，
+# 一次计算只需对信号做一次正向 FFT，再对所有尺度做一次批量逆 FFT。
+# 滤波器组按 (wavelet, scales, length, fs) 缓存，模型训练与界面分析共用；
+# 单个滤波器组可达数十 MB（尺度数 x FFT 长度的复数矩阵），缓存按总字节数淘汰最久未使用的。
+
+PRECISION = 12  # 与 pywt.cwt 默认值一致
+FILTER_BANK_CACHE_BYTES = 128 * 2 ** 20
+
+FilterBank = namedtuple('FilterBank', ['kernels', 'offsets', 'n_fft', 'frequencies', 'complex_cwt'])
+
+
+def _wavelet_name(wavelet):
+    return wavelet.name if isinstance(wavelet, pywt.ContinuousWavelet) else str(wavelet)
+
+
+def _scale_kernels(wavelet, scales):
+    """ 按 pywt.cwt 的方式对每个尺度采样积分小波，返回时域核列表 """
+    wavelet = pywt.ContinuousWavelet(wavelet)
+    int_psi, x = pywt.integrate_wavelet(wavelet, precision=PRECISION)
+    if wavelet.complex_cwt:
+        int_psi = np.conj(int_psi)
+    step = x[1] - x[0]
+
+    kernels = []
+    for scale in scales:
+        j = (np.arange(scale * (x[-1] - x[0]) + 1) / (scale * step)).astype(int)
+        j = j[j < int_psi.size]
+        kernels.append(int_psi[j][::-1])
+        if kernels[-1].size < 2:
+            raise ValueError(f"Selected scale of {scale} too small.")
+    return wavelet, kernels
+
+
+def _build_filter_bank(wavelet, scales, length, fs=1.0):
+    """
+    构建频域小波滤波器组。
+
+    参数：
+    - wavelet: 小波名称，如 'morl'、'cmor'
+    - scales: 尺度元组
+    - length: 信号长度
+    - fs: 采样频率，只影响返回的频率轴
+    """
+    wavelet, kernels = _scale_kernels(wavelet, scales)
+    # 差分后的卷积长度为 length + K，取公共 FFT 长度避免循环卷积
+    n_fft = next_fast_len(length + max(k.size for k in kernels))
+    complex_cwt = wavelet.complex_cwt
+    n_freq = n_fft if complex_cwt else n_fft // 2 + 1
+
+    # pywt 的 -sqrt(s) * diff(conv) 直接并入频域核：乘以 (1 - e^{-iω})
+    omega = 2 * np.pi * np.arange(n_freq) / n_fft
+    diff = -(1 - np.exp(-1j * omega))
+
+    bank = np.empty((len(scales), n_freq), dtype=np.complex128)
+    offsets = np.empty(len(scales), dtype=np.intp)
+    for i, (scale, kernel) in enumerate(zip(scales, kernels)):
+        spectrum = np.fft.fft(kernel, n_fft) if complex_cwt else np.fft.rfft(kernel, n_fft)
+        bank[i] = np.sqrt(scale) * diff * spectrum
+        # pywt 两端裁掉 floor(d) / ceil(d) 个点，差分结果整体后移 1 位
+        offsets[i] = int(np.floor((kernel.size - 2) / 2.)) + 1
+
+    frequencies = np.atleast_1d(pywt.scale2frequency(wavelet, np.asarray(scales), PRECISION)) * fs
+    bank.setflags(write=False)
+    offsets.setflags(write=False)
+    frequencies.setflags(write=False)
+    return FilterBank(bank, offsets, n_fft, frequencies, complex_cwt)
+
+
+class _FilterBankCache:
+    """ 滤波器组的 LRU 缓存，按总字节数淘汰；单个超过上限的滤波器组不缓存 """
+
+    def __init__(self, max_bytes=FILTER_BANK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    @staticmethod
+    def _size(bank):
+        return bank.kernels.nbytes + bank.offsets.nbytes + bank.frequencies.nbytes
+
+    def get(self, key):
+        with self._lock:
+            bank = self._items.get(key)
+            if bank is not None:
+                self._items.move_to_end(key)
+            return bank
+
+    def put(self, key, bank):
+        size = self._size(bank)
+        if size > self.max_bytes:
+            return bank
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= self._size(old)
+            self._items[key] = bank
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= self._size(evicted)
+        return bank
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+_filter_banks = _FilterBankCache()
+
+
+def get_filter_bank(wavelet, scales, length, fs=1.0):
+    """ 频域小波滤波器组（参数同 _build_filter_bank），按参数缓存，缓存总大小不超过 FILTER_BANK_CACHE_BYTES """
+    key = (wavelet, scales, length, fs)
+    bank = _filter_banks.get(key)
+    if bank is None:
+        # 在锁外构建，不同参数的滤波器组可以同时构建
+        bank = _filter_banks.put(key, _build_filter_bank(wavelet, scales, length, fs))
+    return bank
+
+
+def cwt(data, scales, wavelet, sampling_period=1.0, axis=-1, max_block_bytes=256 * 2 ** 20):
+    """
+    连续小波变换，接口与 pywt.cwt 相同，返回 (coefs, frequencies)，coefs 形状为 (n_scales,) + data.shape。
+
+    max_block_bytes 限制一次逆 FFT 的中间结果大小，长信号会按尺度分块计算。
+    """
+    data = np.asarray(data)
+    if data.dtype.kind not in 'fc':
+        data = data.astype(np.float64)
+    scales = tuple(float(s) for s in np.atleast_1d(scales))
+    if any(s <= 0 for s in scales):
+        raise ValueError("`scales` must only include positive values")
+
+    data = np.moveaxis(data, axis, -1)
+    batch_shape, n = data.shape[:-1], data.shape[-1]
+    bank = get_filter_bank(_wavelet_name(wavelet), scales, n, 1.0 / sampling_period)
+
+    use_complex = bank.complex_cwt or np.iscomplexobj(data)
+    if use_complex:
+        dt_out = np.result_type(data.dtype, np.complex64)
+    else:
+        dt_out = data.dtype
+
+    flat = data.reshape(-1, n)
+    if use_complex:
+        kernels = bank.kernels
+        if not bank.complex_cwt:
+            # 实小波作用于复信号：由单边谱恢复完整频谱
+            full = np.empty((len(scales), bank.n_fft), dtype=np.complex128)
+            full[:, :kernels.shape[1]] = kernels
+            full[:, kernels.shape[1]:] = np.conj(kernels[:, 1:(bank.n_fft + 1) // 2][:, ::-1])
+            kernels = full
+        spectrum = np.fft.fft(flat, bank.n_fft, axis=-1)
+    else:
+        kernels = bank.kernels
+        spectrum = np.fft.rfft(flat, bank.n_fft, axis=-1)
+
+    out = np.empty((len(scales), flat.shape[0], n), dtype=dt_out)
+    row_bytes = flat.shape[0] * bank.n_fft * 16
+    block = max(1, int(max_block_bytes // max(row_bytes, 1)))
+    positions = np.arange(n)
+    for start in range(0, len(scales), block):
+        stop = min(start + block, len(scales))
+        product = spectrum[None, :, :] * kernels[start:stop, None, :]
+        if use_complex:
+            conv = np.fft.ifft(product, axis=-1)
+        else:
+            conv = np.fft.irfft(product, bank.n_fft, axis=-1)
+        idx = bank.offsets[start:stop, None, None] + positions
+        out[start:stop] = np.take_along_axis(conv, np.broadcast_to(idx, conv.shape[:2] + (n,)), axis=-1)
+
+    out = out.reshape((len(scales),) + batch_shape + (n,))
+    out = np.moveaxis(out, -1, axis if axis < 0 else axis + 1)
+    return out, np.array(bank.frequencies)
+
+
+@functools.lru_cache(maxsize=8)
+def cwt_mean_weights(n_points, scales, wavelet='morl'):
+    """
+    CWT 系数沿时间轴均值的线性权重 W，形状 (n_points, n_scales)，满足 mean(cwt(x), axis=-1) == x @ W。
+
+    coef = -sqrt(s) * diff(conv)[a:a+N]，求和后差分相消，只剩 conv[a+N] - conv[a]，
+    因此整批样本所有尺度的均值只需一次矩阵乘法。
+    """
+    _, kernels = _scale_kernels(wavelet, scales)
+    weights = np.zeros((n_points, len(scales)), dtype=kernels[0].dtype)
+    j = np.arange(n_points)
+    for col, (scale, kernel) in enumerate(zip(scales, kernels)):
+        k = kernel.size
+        a = int(np.floor((k - 2) / 2.))
+        hi, lo = a + n_points - j, a - j
+        w = np.where((hi >= 0) & (hi < k), kernel[np.clip(hi, 0, k - 1)], 0)
+        w = w - np.where((lo >= 0) & (lo < k), kernel[np.clip(lo, 0, k - 1)], 0)
+        weights[:, col] = -np.sqrt(scale) / n_points * w
+    weights.setflags(write=False)
+    return weights
@@ -0,0 +1,146 @@
+import os
+import json
+import inspect
+import hashlib
+import functools
+import numpy as np
+
+# 特征缓存：以 (样本数据, 提取函数, 参数) 的哈希为键，把特征矩阵保存为 .npy，
+# 只修改模型超参数时可以直接复用上一次的特征。
+#
+# 键中包含提取函数的源码哈希、提取参数和调用方给出的版本号（version）：
+# 源码哈希只覆盖顶层提取函数，它调用的辅助代码（CWT、滤波器组、模块常量等）修改后，
+# 由调用方递增版本号（如 cnn_lstm_features.EXTRACTOR_VERSION）使旧结果失效；
+# 缓存目录超过 max_bytes 时按最近使用时间（文件 mtime）淘汰。
+
+DEFAULT_CACHE_DIR = os.environ.get('PUMP_FEATURE_CACHE', '.feature_cache')
+DEFAULT_MAX_BYTES = 20 * 2 ** 30
+HASH_BLOCK_BYTES = 64 * 2 ** 20
+
+
+def extractor_name(func):
+    func = _unwrap(func)
+    return getattr(func, '__qualname__', None) or getattr(func, '__name__', type(func).__name__)
+
+
+def extractor_version(func):
+    """ 提取函数的源码哈希；代码一改，版本就变 """
+    func = _unwrap(func)
+    try:
+        source = inspect.getsource(func).encode('utf-8')
+    except (OSError, TypeError):
+        source = func.__code__.co_code if hasattr(func, '__code__') else repr(func).encode('utf-8')
+    return hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+def _unwrap(func):
+    while isinstance(func, functools.partial):
+        func = func.func
+    return func
+
+
+def _hash_array(h, data):
+    """ 分块哈希样本矩阵，内存映射数据不会被整体读入内存 """
+    h.update(f"{np.dtype(data.dtype).str}{tuple(data.shape)}".encode('utf-8'))
+    if len(data) == 0:
+        return
+    row_bytes = max(1, data[0].nbytes)
+    step = max(1, HASH_BLOCK_BYTES // row_bytes)
+    for start in range(0, len(data), step):
+        h.update(memoryview(np.ascontiguousarray(data[start:start + step])).cast('B'))
+
+
+class FeatureCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, func, data, params=None, version=None):
+        """ 缓存键：提取函数名-哈希(函数源码, 版本号, 参数, 样本数据) """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(extractor_version(func).encode('utf-8'))
+        h.update(json.dumps(version, sort_keys=True, default=str).encode('utf-8'))
+        h.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+        _hash_array(h, np.asarray(data))
+        return f"{extractor_name(func)}-{h.hexdigest()}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npy')
+
+    def get(self, key):
+        """ 命中时返回内存映射的特征矩阵并刷新使用时间，否则返回 None """
+        path = self._path(key)
+        try:
+            features = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return features
+
+    def put(self, key, features):
+        path = self._path(key)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, np.asarray(features))
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def get_or_compute(self, func, data, params=None, compute=None, version=None):
+        """
+        返回 func 作用于 data 每一行的特征矩阵，优先使用缓存。
+
+        参数：
+        - func: 单样本特征提取函数
+        - data: 样本矩阵 (n_samples, n_points)
+        - params: 传给 func 的关键字参数，同时参与缓存键（如 sr、n_mels、wavelet）
+        - compute: 未命中时的计算方式 compute(bound_func, data)，默认逐样本计算，
+                   可传入 parallel_extract 做多进程提取
+        - version: 参与缓存键但不传给 func 的版本信息（版本号、辅助代码使用的常量等），可 JSON 序列化
+        """
+        params = params or {}
+        key = self.key(func, data, params, version)
+        features = self.get(key)
+        if features is not None:
+            print(f"特征缓存命中: {key}")
+            return features
+
+        bound = functools.partial(func, **params) if params else func
+        if compute is None:
+            features = np.array([bound(sample) for sample in data])
+        else:
+            features = compute(bound, data)
+        return self.put(key, features)
+
+    def entries(self):
+        """ 返回 [(path, size, mtime)]，按最近使用时间从旧到新排序 """
+        result = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npy'):
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                result.append((path, st.st_size, st.st_mtime))
+        return sorted(result, key=lambda e: e[2])
+
+    def evict(self, keep=None):
+        """ 按 LRU 淘汰，直到总大小不超过 max_bytes（keep 为刚写入、不参与淘汰的条目） """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def invalidate(self, func=None):
+        """ 删除某个提取函数的全部缓存（func 为 None 时清空缓存） """
+        prefix = extractor_name(func) + '-' if func is not None else ''
+        for path, _, _ in self.entries():
+            if os.path.basename(path).startswith(prefix):
+                os.remove(path)
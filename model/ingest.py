@@ -0,0 +1,111 @@
+import os
+from collections import namedtuple
+import numpy as np
+import dataset
+
+# 上传录音的接入：识别文件格式，并以内存映射方式暴露信号，分析和诊断只读取用到的部分。
+#   text: 制表符分隔文本。多列时与训练数据相同（每行一个样本，最后一列为标签），
+#         单列时为一段连续信号；都会分块转换为二进制后再内存映射，
+#         已有不旧于文本文件的转换结果时直接复用（与 dataset.load_data 的判断方式相同）
+#   wav:  WAV 文件，直接映射 data 块
+#   npy:  NumPy .npy 文件
+#   raw:  无文件头的二进制采样点，数据类型由 raw_dtype 指定
+#
+# Recording.samples 形状为 (n_rows, n_points)：文本数据每行一个样本，音频每行一个通道。
+
+Recording = namedtuple('Recording', ['samples', 'labels', 'fs', 'format', 'path'])
+
+SNIFF_BYTES = 4096
+_TEXT_CHARS = set(b'0123456789+-.eEnaNiIfF \t\r\n,#')
+
+
+def detect_format(path):
+    """ 根据文件头识别格式：'dataset' / 'wav' / 'npy' / 'text' / 'raw' """
+    if os.path.isdir(path):
+        return 'dataset'
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head.startswith(b'\x93NUMPY'):
+        return 'npy'
+    if head and set(head) <= _TEXT_CHARS:
+        return 'text'
+    return 'raw'
+
+
+def _text_columns(path):
+    with open(path, 'r') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#'):
+                return len(stripped.split('\t'))
+    raise ValueError(f"{path} 中没有可用的数据行")
+
+
+def convert_column(path, out_path=None, dtype=np.float64, chunk_rows=100000):
+    """ 单列文本信号分块转换为 .npy（内存占用只与 chunk_rows 有关），返回输出路径；已有不旧于文本文件的结果时直接返回 """
+    out_path = out_path or os.path.splitext(path)[0] + '.npy'
+    if os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(path):
+        return out_path
+    with open(path, 'r') as f:
+        n = sum(1 for line in f if line.strip() and not line.lstrip().startswith('#'))
+
+    tmp_path = out_path + '.tmp.npy'
+    signal = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(n,))
+    row = 0
+    with open(path, 'r') as f:
+        chunk = []
+        for line in f:
+            if line.strip() and not line.lstrip().startswith('#'):
+                chunk.append(line)
+                if len(chunk) == chunk_rows:
+                    signal[row:row + len(chunk)] = np.loadtxt(chunk, ndmin=1)
+                    row += len(chunk)
+                    chunk = []
+        if chunk:
+            signal[row:row + len(chunk)] = np.loadtxt(chunk, ndmin=1)
+    signal.flush()
+    del signal
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def open_recording(path, fs=1000, raw_dtype='<f4', fmt=None):
+    """
+    打开上传的录音，返回 Recording(samples, labels, fs, format, path)。
+
+    参数：
+    - fs: 文件本身不含采样率时（文本、npy、raw）使用的采样频率
+    - raw_dtype: raw 格式的采样点数据类型
+    - fmt: 指定格式，默认按文件头识别
+    """
+    fmt = fmt or detect_format(path)
+    labels = None
+    if fmt == 'dataset':
+        samples, labels = dataset.open_store(path)
+    elif fmt == 'wav':
+        from scipy.io import wavfile
+        fs, data = wavfile.read(path, mmap=True)
+        samples = data.reshape(len(data), -1).T
+    elif fmt == 'npy':
+        samples = np.load(path, mmap_mode='r')
+    elif fmt == 'text':
+        if _text_columns(path) > 1:
+            samples, labels = dataset.open_store(dataset.fresh_store(path) or dataset.convert_to_store(path))
+        else:
+            samples = np.load(convert_column(path), mmap_mode='r')
+    elif fmt == 'raw':
+        dtype = np.dtype(raw_dtype)
+        n = os.path.getsize(path) // dtype.itemsize
+        if n == 0:
+            raise ValueError(f"{path} 中没有完整的采样点")
+        samples = np.memmap(path, dtype=dtype, mode='r', shape=(n,))
+    else:
+        raise ValueError(f"不支持的格式: {fmt}")
+
+    if samples.ndim == 1:
+        samples = samples[None, :]
+    elif samples.ndim != 2:
+        raise ValueError(f"{path} 的数据维数不支持: {samples.shape}")
+    return Recording(samples, labels, fs, fmt, path)
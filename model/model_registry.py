@@ -0,0 +1,41 @@
+import os
+import threading
+import joblib
+
+# 进程内模型注册表：每个模型文件只加载一次，文件修改时间变化后才重新加载。
+
+
+class ModelRegistry:
+    def __init__(self, loader=joblib.load):
+        self.loader = loader
+        self._models = {}  # 路径 -> ((mtime, size), 模型对象)
+        self._lock = threading.Lock()
+
+    def get(self, model_name):
+        """ 返回已加载的模型；文件被重新训练覆盖后自动重新加载 """
+        path = os.path.abspath(model_name)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        entry = self._models.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is None or entry[0] != stamp:
+                entry = (stamp, self.loader(path))
+                self._models[path] = entry
+        return entry[1]
+
+    def unload(self, model_name=None):
+        """ 移除某个模型（model_name 为 None 时清空） """
+        with self._lock:
+            if model_name is None:
+                self._models.clear()
+            else:
+                self._models.pop(os.path.abspath(model_name), None)
+
+
+# 全局共享实例
+registry = ModelRegistry()
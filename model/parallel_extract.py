@@ -0,0 +1,133 @@
+import os
+import math
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+# 多进程特征提取：
+#   输入矩阵以内存映射的 .npy 文件交给子进程（不经 pickle 传输），
+#   子进程把结果直接写入内存映射的输出 .npy，主进程只收到已完成的行数。
+
+_worker = {}
+
+
+def _source_path(data, tmp_dir):
+    """ 返回可供子进程内存映射打开的输入 .npy 路径；必要时先写入临时文件 """
+    if isinstance(data, np.memmap) and data.filename and data.flags.c_contiguous:
+        try:
+            whole = np.load(data.filename, mmap_mode='r')
+        except (OSError, ValueError):
+            whole = None
+        # 只有整个数组（而不是切片）才能直接复用原文件
+        if whole is not None and whole.shape == data.shape and whole.dtype == data.dtype \
+                and whole.offset == data.offset:
+            return data.filename
+
+    path = os.path.join(tmp_dir, 'input.npy')
+    src = np.lib.format.open_memmap(path, mode='w+', dtype=data.dtype, shape=data.shape)
+    src[:] = data
+    src.flush()
+    del src
+    return path
+
+
+def _init_worker(func, src_path, out_path, batch=False):
+    _worker['func'] = func
+    _worker['batch'] = batch
+    _worker['src'] = np.load(src_path, mmap_mode='r')
+    _worker['out'] = np.load(out_path, mmap_mode='r+')
+
+
+def _extract_rows(start, stop):
+    func, src, out = _worker['func'], _worker['src'], _worker['out']
+    if _worker['batch']:
+        out[start:stop] = func(src[start:stop])
+    else:
+        for i in range(start, stop):
+            out[i] = func(np.asarray(src[i]))
+    out.flush()
+    return stop - start
+
+
+def _printer(name, interval=1.0):
+    """ 打印进度，最多每 interval 秒一次（完成时总会打印） """
+    t0 = time.perf_counter()
+    last = [t0]
+
+    def report(done, total):
+        now = time.perf_counter()
+        if done < total and now - last[0] < interval:
+            return
+        last[0] = now
+        rate = done / (now - t0) if now > t0 else 0
+        print(f"{name}: {done}/{total} ({100 * done / total:.1f}%), {rate:.1f} 样本/s")
+    return report
+
+
+def parallel_extract(func, data, out_path=None, n_workers=None, chunk_rows=None, progress=True, name="特征提取",
+                     batch=False):
+    """
+    对样本矩阵的每一行并行调用 func，返回形状为 (n_samples,) + func 输出形状的数组。
+
+    参数：
+    - func: 单样本特征提取函数（需可被 pickle，即模块级函数或 functools.partial）
+    - data: 样本矩阵 (n_samples, n_points)，可以是内存映射数组
+    - out_path: 结果 .npy 路径；给定时返回该文件的内存映射，否则返回内存中的数组
+    - n_workers: 进程数，默认使用全部 CPU；1 表示在当前进程内计算
+    - chunk_rows: 每个任务处理的行数，默认按进程数自动划分
+    - progress: True 打印进度，也可以传入回调 progress(done, total)
+    - batch: True 表示 func 是批量提取函数，输入若干行样本、返回这些行的特征
+    """
+    n_samples = len(data)
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_samples == 0:
+        raise ValueError("没有可提取的样本")
+
+    # 用第一个样本确定输出形状和类型
+    first = np.asarray(func(np.asarray(data[:1]))[0] if batch else func(np.asarray(data[0])))
+
+    with tempfile.TemporaryDirectory(prefix='parallel_extract_') as tmp_dir:
+        target = out_path or os.path.join(tmp_dir, 'output.npy')
+        out = np.lib.format.open_memmap(target, mode='w+', dtype=first.dtype,
+                                        shape=(n_samples,) + first.shape)
+        out[0] = first
+        out.flush()
+
+        if callable(progress):
+            report = progress
+        elif progress:
+            report = _printer(name)
+        else:
+            report = lambda done, total: None
+
+        done = 1
+        if n_workers == 1 or n_samples == 1:
+            step = chunk_rows or max(1, (n_samples - 1) // 20)
+            for start in range(1, n_samples, step):
+                stop = min(start + step, n_samples)
+                if batch:
+                    out[start:stop] = func(data[start:stop])
+                else:
+                    for i in range(start, stop):
+                        out[i] = func(np.asarray(data[i]))
+                done += stop - start
+                report(done, n_samples)
+        else:
+            src_path = _source_path(data, tmp_dir)
+            step = chunk_rows or max(1, math.ceil((n_samples - 1) / (n_workers * 8)))
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(func, src_path, target, batch)) as pool:
+                futures = [pool.submit(_extract_rows, start, min(start + step, n_samples))
+                           for start in range(1, n_samples, step)]
+                for future in as_completed(futures):
+                    done += future.result()
+                    report(done, n_samples)
+
+        out.flush()
+        if out_path:
+            del out
+            return np.load(out_path, mmap_mode='r')
+        result = np.array(out)
+        del out
+        return result
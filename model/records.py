@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+import numpy as np
+
+# 诊断记录库（SQLite，单个本地文件）：
+#   - (pump, ts, id) 与 (ts, id) 两个索引，按泵和时间查询都只扫描需要的行
+#   - add_many 在一个事务中批量写入
+#   - page 使用键集分页：以上一页最后一条的 (ts, id) 为游标，翻到第几页耗时都一样，
+#     不使用 OFFSET（OFFSET 需要先跳过前面的全部行）
+# 列表查询只返回摘要字段，特征向量和缩略图在查看单条记录时才读取。
+# probabilities 列保存模型给出的各类别得分（SVM 为 decision_function 的值，不是归一化的概率）。
+
+DEFAULT_DB = os.environ.get('PUMP_RECORDS_DB', 'diagnosis_records.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    pump TEXT NOT NULL,
+    ts REAL NOT NULL,
+    verdict TEXT NOT NULL,
+    probabilities TEXT,
+    features BLOB,
+    thumbnail BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_records_pump_ts ON records (pump, ts, id);
+CREATE INDEX IF NOT EXISTS idx_records_ts ON records (ts, id);
+"""
+
+RecordSummary = namedtuple('RecordSummary', ['id', 'pump', 'ts', 'verdict'])
+Record = namedtuple('Record', ['id', 'pump', 'ts', 'verdict', 'probabilities', 'features', 'thumbnail'])
+
+
+def _row(pump, verdict, probabilities=None, features=None, thumbnail=None, ts=None):
+    return (
+        str(pump),
+        time.time() if ts is None else float(ts),
+        str(verdict),
+        None if probabilities is None else json.dumps(np.asarray(probabilities, dtype=float).tolist()),
+        None if features is None else np.asarray(features, dtype='<f4').tobytes(),
+        thumbnail,
+    )
+
+
+class RecordStore:
+    """
+    参数：
+    - path: 数据库文件路径
+    每个线程使用自己的连接（remi 事件回调与后台任务在不同线程中执行）。
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def add(self, pump, verdict, probabilities=None, features=None, thumbnail=None, ts=None):
+        """ 保存一条诊断记录，返回记录 id """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO records (pump, ts, verdict, probabilities, features, thumbnail) VALUES (?, ?, ?, ?, ?, ?)",
+                _row(pump, verdict, probabilities, features, thumbnail, ts))
+            return cursor.lastrowid
+
+    def add_many(self, records):
+        """ 批量保存，records 为 dict 序列（键同 add 的参数），在一个事务中写入，返回条数 """
+        rows = [_row(**record) for record in records]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO records (pump, ts, verdict, probabilities, features, thumbnail) VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+        return len(rows)
+
+    def page(self, pump=None, cursor=None, limit=50, since=None, until=None):
+        """
+        按时间倒序取一页记录摘要，返回 (rows, next_cursor)。
+
+        cursor 为上一页返回的 next_cursor，None 表示第一页；next_cursor 为 None 表示没有更多记录。
+        """
+        where, params = [], []
+        if pump is not None:
+            where.append("pump = ?")
+            params.append(pump)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        if cursor is not None:
+            where.append("(ts, id) < (?, ?)")
+            params.extend(cursor)
+        sql = "SELECT id, pump, ts, verdict FROM records"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        rows = [RecordSummary(*row) for row in self._connect().execute(sql, params)]
+        next_cursor = (rows[-1].ts, rows[-1].id) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def get(self, record_id):
+        """ 读取单条完整记录（含概率、特征向量和缩略图），不存在时返回 None """
+        row = self._connect().execute(
+            "SELECT id, pump, ts, verdict, probabilities, features, thumbnail FROM records WHERE id = ?",
+            (record_id,)).fetchone()
+        if row is None:
+            return None
+        record_id, pump, ts, verdict, probabilities, features, thumbnail = row
+        return Record(record_id, pump, ts, verdict,
+                      None if probabilities is None else np.array(json.loads(probabilities)),
+                      None if features is None else np.frombuffer(features, dtype='<f4'),
+                      thumbnail)
+
+    def pumps(self):
+        """ 有记录的全部泵编号（使用索引跳跃扫描） """
+        pumps = []
+        conn = self._connect()
+        row = conn.execute("SELECT MIN(pump) FROM records").fetchone()
+        while row is not None and row[0] is not None:
+            pumps.append(row[0])
+            row = conn.execute("SELECT MIN(pump) FROM records WHERE pump > ?", (row[0],)).fetchone()
+        return pumps
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=DEFAULT_DB):
+    """ 进程内共享的记录库 """
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = RecordStore(path)
+        return store
@@ -0,0 +1,91 @@
+import functools
+import numpy as np
+
+# 增量频谱：新数据到达时只对新凑满的一帧做 FFT（加窗、帧间重叠），
+# 显示的幅度谱是最近 n_frames 帧的平均（Welch 法），用滑动和维护，
+# 每次更新的代价与整段信号长度无关。
+
+
+@functools.lru_cache(maxsize=16)
+def get_window(frame_size, window='hann'):
+    """ 缓存的周期窗函数及其幅度归一化系数（正弦波幅度还原为真实幅值） """
+    n = np.arange(frame_size)
+    if window == 'hann':
+        w = 0.5 - 0.5 * np.cos(2 * np.pi * n / frame_size)
+    elif window == 'hamming':
+        w = 0.54 - 0.46 * np.cos(2 * np.pi * n / frame_size)
+    elif window in ('boxcar', 'rect'):
+        w = np.ones(frame_size)
+    else:
+        raise ValueError(f"不支持的窗函数: {window}")
+    w.setflags(write=False)
+    return w, 2.0 / w.sum()
+
+
+class IncrementalSpectrum:
+    """
+    参数：
+    - fs: 采样频率
+    - frame_size: 每帧点数，决定频率分辨率 fs / frame_size
+    - hop: 帧移，默认半帧重叠
+    - n_frames: 参与平均的帧数，即显示的频谱覆盖最近约 frame_size + (n_frames - 1) * hop 个点
+    """
+
+    def __init__(self, fs, frame_size=1024, hop=None, n_frames=32, window='hann'):
+        self.fs = fs
+        self.frame_size = frame_size
+        self.hop = hop or frame_size // 2
+        self.n_frames = n_frames
+        self.window, self._scale = get_window(frame_size, window)
+        self.freqs = np.fft.rfftfreq(frame_size, 1 / fs)
+
+        n_bins = frame_size // 2 + 1
+        self._frames = np.zeros((n_frames, n_bins))  # 最近 n_frames 帧的幅度谱（环形）
+        self._sum = np.zeros(n_bins)
+        self._slot = 0
+        self._count = 0  # 已计算的帧数
+        self._buf = np.zeros(frame_size)
+        self._filled = 0  # 缓冲区中已有的点数
+
+    @property
+    def span(self):
+        """ 平均幅度谱覆盖的点数，载入整段录音时只需推入最后这么多点 """
+        return self.frame_size + (self.n_frames - 1) * self.hop
+
+    def push(self, samples):
+        """ 写入新采样点，返回本次新算出的帧幅度谱列表（用于只更新变化的部分） """
+        samples = np.asarray(samples, dtype=np.float64).ravel()
+        new_frames = []
+        while len(samples):
+            n = min(len(samples), self.frame_size - self._filled)
+            self._buf[self._filled:self._filled + n] = samples[:n]
+            self._filled += n
+            samples = samples[n:]
+            if self._filled == self.frame_size:
+                new_frames.append(self._add_frame(self._buf))
+                # 保留重叠部分
+                keep = self.frame_size - self.hop
+                self._buf[:keep] = self._buf[self.hop:]
+                self._filled = keep
+        return new_frames
+
+    def _add_frame(self, frame):
+        mag = np.abs(np.fft.rfft(frame * self.window)) * self._scale
+        slot = self._slot
+        self._sum += mag - self._frames[slot]
+        self._frames[slot] = mag
+        self._slot = (slot + 1) % self.n_frames
+        self._count += 1
+        if self._slot == 0:
+            # 每转一圈重新求和，消除浮点累积误差
+            self._sum = self._frames.sum(axis=0)
+        return mag
+
+    def magnitude(self):
+        """ 当前平均幅度谱，与 self.freqs 对应 """
+        return self._sum / max(1, min(self._count, self.n_frames))
+
+    def reset(self):
+        self._frames[:] = 0
+        self._sum[:] = 0
+        self._slot = self._count = self._filled = 0
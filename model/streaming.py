@@ -0,0 +1,163 @@
+import time
+import numpy as np
+import fast_cwt
+
+# 实时流式诊断：多通道传感器数据按块写入环形缓冲区，每前进 hop 个采样点输出一次故障判定。
+#
+# 窗口内的均值、标准差、偏度、峰度不再对整窗重算：每个 hop 块只计算一次自身的中心矩，
+# 窗口统计量由各块的中心矩精确合并得到；小波均值特征是信号的线性函数（fast_cwt.cwt_mean_weights），
+# 每个窗口只需一次矩阵乘法。
+
+
+class RingBuffer:
+    """ 多通道环形缓冲区，数据写两份，任意时刻最近 capacity 个点都是一段连续内存 """
+
+    def __init__(self, n_channels, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self._pos = 0
+        self.count = 0  # 累计写入的点数
+
+    def write(self, chunk):
+        """ chunk 形状 (n_points, n_channels) """
+        chunk = np.asarray(chunk)
+        self.count += len(chunk)
+        chunk = chunk[-self.capacity:].T
+        n = chunk.shape[1]
+        first = min(n, self.capacity - self._pos)
+        for offset in (0, self.capacity):
+            self._data[:, offset + self._pos:offset + self._pos + first] = chunk[:, :first]
+            self._data[:, offset:offset + n - first] = chunk[:, first:]
+        self._pos = (self._pos + n) % self.capacity
+
+    def latest(self, n):
+        """ 最近 n 个点，形状 (n_channels, n)，为只读视图 """
+        end = self._pos + self.capacity
+        view = self._data[:, end - n:end]
+        view.flags.writeable = False
+        return view
+
+
+class OnlineMoments:
+    """
+    滑动窗口的在线矩统计：窗口由 n_blocks 个 hop 块组成，每块保存 (均值, M2, M3, M4)，
+    窗口统计量按组合公式从各块合并（d_i 为块均值与窗口均值之差）：
+        M2 = Σ M2_i + n_i d_i²
+        M3 = Σ M3_i + 3 d_i M2_i + n_i d_i³
+        M4 = Σ M4_i + 4 d_i M3_i + 6 d_i² M2_i + n_i d_i⁴
+    """
+
+    def __init__(self, n_channels, n_blocks):
+        self.n_blocks = n_blocks
+        self._n = np.zeros((n_blocks, 1))
+        self._mean = np.zeros((n_blocks, n_channels))
+        self._m2 = np.zeros((n_blocks, n_channels))
+        self._m3 = np.zeros((n_blocks, n_channels))
+        self._m4 = np.zeros((n_blocks, n_channels))
+        self._slot = 0
+
+    def push(self, block):
+        """ 加入一个 hop 块（形状 (n_channels, hop)），并挤出最旧的块 """
+        mean = block.mean(axis=1)
+        centered = block - mean[:, None]
+        squared = centered * centered
+        i = self._slot
+        self._n[i] = block.shape[1]
+        self._mean[i] = mean
+        self._m2[i] = squared.sum(axis=1)
+        self._m3[i] = (squared * centered).sum(axis=1)
+        self._m4[i] = (squared * squared).sum(axis=1)
+        self._slot = (i + 1) % self.n_blocks
+
+    def stats(self):
+        """ 返回窗口内各通道的 (mean, std, skew, kurt) """
+        n = self._n.sum()
+        mean = (self._n * self._mean).sum(axis=0) / n
+        d = self._mean - mean
+        d2 = d * d
+        m2 = (self._m2 + self._n * d2).sum(axis=0)
+        m3 = (self._m3 + 3 * d * self._m2 + self._n * d2 * d).sum(axis=0)
+        m4 = (self._m4 + 4 * d * self._m3 + 6 * d2 * self._m2 + self._n * d2 * d2).sum(axis=0)
+        std = np.sqrt(m2 / n)
+        return mean, std, (m3 / n) / std ** 3, (m4 / n) / std ** 4
+
+
+class StreamingDiagnoser:
+    """
+    流式故障诊断。
+
+    参数：
+    - classify: 批量分类函数，输入 (n_channels, 24) 特征矩阵，返回每个通道的判定
+    - n_channels: 通道数
+    - window: 窗口长度（应与训练样本长度一致，特征才可比）
+    - hop: 每隔多少个点输出一次判定，window 必须是 hop 的整数倍
+    - on_verdict: 可选回调 on_verdict(sample_index, features, verdicts)
+    """
+
+    def __init__(self, classify, n_channels=1, window=1024, hop=256, scales=tuple(range(1, 21)),
+                 wavelet='morl', on_verdict=None):
+        if window % hop:
+            raise ValueError("window 必须是 hop 的整数倍")
+        self.classify = classify
+        self.window = window
+        self.hop = hop
+        self.on_verdict = on_verdict
+        self.buffer = RingBuffer(n_channels, window)
+        self.moments = OnlineMoments(n_channels, window // hop)
+        self.cwt_weights = fast_cwt.cwt_mean_weights(window, tuple(scales), wavelet)
+        self._pending = 0  # 当前 hop 块中已写入的点数
+
+    def push(self, chunk):
+        """ 写入一块数据（形状 (n_points, n_channels)），返回本次产生的 [(sample_index, features, verdicts)] """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        results = []
+        while len(chunk):
+            n = min(len(chunk), self.hop - self._pending)
+            self.buffer.write(chunk[:n])
+            chunk = chunk[n:]
+            self._pending += n
+            if self._pending == self.hop:
+                self._pending = 0
+                self.moments.push(self.buffer.latest(self.hop))
+                if self.buffer.count >= self.window:
+                    results.append(self._emit())
+        return results
+
+    def features(self):
+        """ 当前窗口各通道的特征矩阵 (n_channels, 24)，与 svm.extract_vibration_features 一致 """
+        mean, std, skew, kurt = self.moments.stats()
+        cwt_mean = self.buffer.latest(self.window) @ self.cwt_weights
+        return np.column_stack([mean, std, skew, kurt, cwt_mean])
+
+    def _emit(self):
+        features = self.features()
+        verdicts = self.classify(features)
+        result = (self.buffer.count, features, verdicts)
+        if self.on_verdict is not None:
+            self.on_verdict(*result)
+        return result
+
+
+def svm_classifier(model_name="vibration_svm.pkl"):
+    """ 使用振动 SVM 模型（常驻注册表）作为流式分类器；.npz 模型用纯 NumPy 预测 """
+    if model_name.endswith('.npz'):
+        import svm_numpy as svm
+    else:
+        import svm
+    return lambda features: svm.predict_many(features, model_name)
+
+
+def replay_source(signal, chunk_size=1024, fs=None):
+    """
+    本地回放数据源：把录制好的 (n_points, n_channels) 信号按块依次产出。
+    给定 fs 时按实际采样率限速，模拟实时传感器。
+    """
+    start = time.perf_counter()
+    for i in range(0, len(signal), chunk_size):
+        if fs is not None:
+            delay = start + i / fs - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield np.asarray(signal[i:i + chunk_size])
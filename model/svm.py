@@ -1,17 +1,26 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import librosa
-import pywt
 import joblib
 from scipy.stats import kurtosis
-from sklearn.svm import SVC
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
+import dataset
+from vibration_features import extract_vibration_features, extract_vibration_features_batch
+from model_registry import registry
 
-# 数据加载
+# 数据加载（优先内存映射读取二进制数据集，否则解析文本）
 def load_data(filename):
-    data = np.loadtxt(filename, delimiter='\t')
-    features = data[:, :-1]
-    labels = data[:, -1]
+    features, labels = dataset.load_data(filename)
     return features, labels
 
 # 声学数据特征提取（使用峰度）
@@ -20,48 +29,309 @@ def extract_acoustic_features(audio_data):
     kurt_val = kurtosis(audio_data)
     return np.array([kurt_val])  # 返回单个特征值
 
-# 振动数据特征提取
-def extract_vibration_features(vibration_data):
-    mean_val = np.mean(vibration_data)
-    std_val = np.std(vibration_data)
-    skew_val = np.mean((vibration_data - mean_val) ** 3) / std_val ** 3
-    kurt_val = np.mean((vibration_data - mean_val) ** 4) / std_val ** 4
-
-    coeffs, _ = pywt.cwt(vibration_data, scales=np.arange(1, 21), wavelet='morl')
-    cwt_mean = np.mean(coeffs, axis=1)
-
-    return np.hstack([mean_val, std_val, skew_val, kurt_val, cwt_mean])
-
 # 训练 SVM
-def train_svm(features, labels, model_name="svm_model.pkl"):
+#   engine='exact'     精确 RBF 核 SVC，训练耗时随样本数超线性增长，预测耗时随支持向量数增长
+#   engine='nystroem'  Nystroem 低秩核映射 + 线性 SVM
+#   engine='rff'       随机傅里叶特征（RBFSampler）+ SGD 线性 SVM（hinge 损失）
+# 近似引擎的训练和预测耗时与样本数成线性关系，模型为 Pipeline，保存格式同样是 (model, scaler)，
+# predict_svm / predict_many 无需修改
+def train_svm(features, labels, model_name="svm_model.pkl", engine='exact', n_components=500, C=1.0):
     scaler = StandardScaler()
     features = scaler.fit_transform(features)  
     X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.2, random_state=42)
 
-    model = SVC(kernel='rbf', C=1.0, gamma='scale')
+    model = make_svm(engine, X_train, n_components=n_components, C=C)
     model.fit(X_train, y_train)
+    if isinstance(model, SVC):
+        model.set_params(gamma=resolve_gamma(model, X_train))
 
     acc = model.score(X_test, y_test)
     print(f"SVM 分类准确率: {acc:.4f}")
 
     joblib.dump((model, scaler), model_name)
 
-# 预测
+def resolve_gamma(model, X_train=None):
+    """
+    RBF SVC 实际使用的 gamma 数值：数值原样返回，'auto' 为 1 / n_features，
+    'scale' 为 1 / (n_features * X_train.var())；未给出训练数据时按标准化后的方差 1 计算（近似值）。
+    训练后用 set_params 把 gamma 固定为该数值，导出时无需依赖 SVC 的私有属性。
+    """
+    gamma = model.gamma
+    if not isinstance(gamma, str):
+        return float(gamma)
+    n_features = model.n_features_in_
+    if gamma == 'auto':
+        return 1.0 / n_features
+    if gamma == 'scale':
+        var = 1.0 if X_train is None else float(np.asarray(X_train).var())
+        return 1.0 / (n_features * var) if var != 0 else 1.0
+    raise ValueError(f"不支持的 gamma: {gamma}")
+
+def make_svm(engine, X_train, n_components=500, C=1.0):
+    """ 按引擎构造未训练的分类器，gamma 与 SVC 的 gamma='scale' 相同 """
+    if engine == 'exact':
+        return SVC(kernel='rbf', C=C, gamma='scale')
+    gamma = 1.0 / (X_train.shape[1] * X_train.var())
+    n_components = min(n_components, len(X_train)) if engine == 'nystroem' else n_components
+    if engine == 'nystroem':
+        return make_pipeline(Nystroem(kernel='rbf', gamma=gamma, n_components=n_components, random_state=42),
+                             LinearSVC(C=C, dual=False))
+    if engine == 'rff':
+        return make_pipeline(RBFSampler(gamma=gamma, n_components=n_components, random_state=42),
+                             SGDClassifier(loss='hinge', alpha=1.0 / (C * len(X_train)), random_state=42))
+    raise ValueError(f"不支持的 SVM 引擎: {engine}")
+
+# 增量训练：每天只用新到的带标签数据更新模型，耗时与新数据量成正比
+def update_svm(features, labels, model_name="svm_model.pkl", classes=None, batch_size=1024, epochs=1,
+               n_components=500, seed=42):
+    """
+    参数：
+    - features, labels: 新数据（可以是内存映射数组，按批读取）
+    - classes: 全部类别，首次训练时使用，默认取 labels 中出现的类别；之后不能出现新类别
+    - batch_size, epochs: 小批量大小与遍数
+    - seed: 每轮打乱样本顺序的随机种子，相同数据得到相同模型
+
+    model_name 已存在时从中恢复 (model, scaler) 继续训练（要求分类器支持 partial_fit，
+    即 engine='rff' 训练或由本函数创建的模型）；否则新建随机傅里叶特征 + SGD 模型。
+    标准化器只在首次训练时用第一批数据拟合，之后保持不变：分类器的权重是在这个特征空间中学到的，
+    若继续累积均值和方差，旧权重面对的输入会随每次更新漂移。
+    """
+    features = np.asarray(features)
+    labels = np.asarray(labels)
+
+    if os.path.exists(model_name):
+        model, scaler = joblib.load(model_name)
+        classifier = model[-1] if hasattr(model, 'steps') else model
+        if not hasattr(classifier, 'partial_fit'):
+            raise ValueError(f"{model_name} 中的模型（{type(classifier).__name__}）不支持增量训练，"
+                             "请先用 engine='rff' 或 update_svm 训练")
+        unknown = np.setdiff1d(np.unique(labels), classifier.classes_)
+        if len(unknown):
+            raise ValueError(f"新数据中出现了模型未见过的类别: {unknown}")
+        classes = classifier.classes_
+        # 更新前先在新数据上按批评估（模型没有见过这些样本）
+        correct = 0
+        for start in range(0, len(labels), batch_size):
+            X = scaler.transform(features[start:start + batch_size])
+            correct += np.sum(model.predict(X) == labels[start:start + batch_size])
+        print(f"更新前在新数据上的准确率: {correct / max(1, len(labels)):.4f}")
+    else:
+        classes = np.unique(labels) if classes is None else np.asarray(classes)
+        # 按批累计均值和方差，与一次性 fit 等价；此后不再更新
+        scaler = StandardScaler()
+        for start in range(0, len(labels), batch_size):
+            scaler.partial_fit(features[start:start + batch_size])
+        model = make_pipeline(RBFSampler(gamma=1.0 / features.shape[1], n_components=n_components, random_state=42),
+                              SGDClassifier(loss='hinge', random_state=42))
+        model[0].fit(features[:1])  # 随机映射只取决于特征维数和 gamma
+
+    feature_map, classifier = model[:-1], model[-1]
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(labels))
+        for start in range(0, len(order), batch_size):
+            index = np.sort(order[start:start + batch_size])  # 有序下标，内存映射读取更连续
+            X = feature_map.transform(scaler.transform(features[index]))
+            classifier.partial_fit(X, labels[index], classes=classes)
+
+    joblib.dump((model, scaler), model_name)
+    print(f"{model_name}: 已用 {len(labels)} 个新样本更新（标准化器基于首次训练的 {int(scaler.n_samples_seen_)} 个样本）")
+    return model, scaler
+
+# 超参数搜索的默认网格：标准化后 gamma='scale' 即 1 / n_features
+DEFAULT_C_GRID = (0.1, 1.0, 10.0, 100.0, 1000.0)
+DEFAULT_GAMMA_GRID = ('scale', 0.001, 0.01, 0.1, 1.0)
+
+
+def report_path(model_name):
+    """ 调参报告与模型文件同名，后缀为 .report.json """
+    return os.path.splitext(model_name)[0] + '.report.json'
+
+
+# 交叉验证搜索 C 与 gamma，保存最优模型（与 train_svm 相同的 (model, scaler) 格式）及调参报告
+def tune_svm(features, labels, model_name="svm_model.pkl", search='grid', C_grid=DEFAULT_C_GRID,
+             gamma_grid=DEFAULT_GAMMA_GRID, cv=5, n_jobs=-1, cache_size=500):
+    """
+    参数：
+    - search: 'grid' 为完整网格搜索，'halving' 为逐轮减半搜索（先用少量样本淘汰大部分候选）
+    - cv: 交叉验证折数
+    - n_jobs: 并行进程数，-1 为全部 CPU 核心
+    - cache_size: 每个 SVC 的核矩阵缓存（MB），较大的缓存可减少核函数的重复计算
+    返回调参报告（dict）
+    """
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    features = scaler.fit_transform(features)
+    X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.2, random_state=42)
+
+    estimator = SVC(kernel='rbf', cache_size=cache_size)
+    grid = {'C': list(C_grid), 'gamma': list(gamma_grid)}
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    if search == 'grid':
+        searcher = GridSearchCV(estimator, grid, cv=folds, n_jobs=n_jobs)
+    elif search == 'halving':
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+        searcher = HalvingGridSearchCV(estimator, grid, cv=folds, n_jobs=n_jobs, factor=3, random_state=42)
+    else:
+        raise ValueError(f"不支持的搜索方式: {search}")
+
+    # 标准化后的训练矩阵写入临时 .npy 并以内存映射传给各工作进程，所有候选与折共享同一份数据
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'X_train.npy')
+        np.save(path, np.ascontiguousarray(X_train))
+        shared = np.load(path, mmap_mode='r')
+        search_start = time.perf_counter()
+        searcher.fit(shared, y_train)
+        search_time = time.perf_counter() - search_start
+        del shared
+
+    model = searcher.best_estimator_
+    model.set_params(gamma=resolve_gamma(model, X_train))
+    acc = model.score(X_test, y_test)
+    joblib.dump((model, scaler), model_name)
+
+    results = searcher.cv_results_
+    order = np.argsort(results['rank_test_score'])
+    report = {
+        'model': model_name,
+        'search': search,
+        'n_samples': int(len(labels)),
+        'n_features': int(features.shape[1]),
+        'cv': cv,
+        'n_candidates': int(len(results['params'])),
+        'best_params': searcher.best_params_,
+        'best_cv_score': float(searcher.best_score_),
+        'test_accuracy': float(acc),
+        'search_seconds': search_time,
+        'total_seconds': time.perf_counter() - start,
+        'candidates': [
+            {
+                'params': results['params'][i],
+                'mean_test_score': float(results['mean_test_score'][i]),
+                'std_test_score': float(results['std_test_score'][i]),
+                'mean_fit_seconds': float(results['mean_fit_time'][i]),
+                **({'n_resources': int(results['n_resources'][i])} if 'n_resources' in results else {}),
+            }
+            for i in order
+        ],
+    }
+    with open(report_path(model_name), 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"{model_name}: 最优参数 {searcher.best_params_}，交叉验证 {searcher.best_score_:.4f}，"
+          f"测试集准确率 {acc:.4f}，搜索用时 {search_time:.1f} s")
+    return report
+
+
+# 多个模态的模型同时调参，CPU 核心平均分配给各模态
+def tune_all(tasks, n_jobs=None, **kwargs):
+    """ tasks: [(features, labels, model_name), ...]，返回各模型的调参报告 """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    per_task = max(1, n_jobs // len(tasks))
+    # 计算在 joblib 工作进程中进行，这里的线程只负责各自的搜索流程
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(tune_svm, features, labels, model_name, n_jobs=per_task, **kwargs)
+                   for features, labels, model_name in tasks]
+        return [future.result() for future in futures]
+
+# 预测（模型只加载一次，文件更新后自动重新加载）
 def predict_svm(feature, model_name="svm_model.pkl"):
+    return predict_many([feature], model_name)[0]
+
+# 批量预测：整批样本只做一次标准化和一次 SVC.predict
+def predict_many(features_2d, model_name="svm_model.pkl"):
+    model, scaler = registry.get(model_name)
+    features_2d = scaler.transform(np.asarray(features_2d))
+    return model.predict(features_2d)
+
+# 批量预测并返回各类别得分（decision_function；两类时为单列决策值，大于 0 判为第二类），用于诊断记录
+def predict_scores(features_2d, model_name="svm_model.pkl"):
+    model, scaler = registry.get(model_name)
+    features_2d = scaler.transform(np.asarray(features_2d))
+    scores = model.decision_function(features_2d).reshape(len(features_2d), -1)
+    return model.predict(features_2d), scores
+
+# 导出为纯 NumPy 模型（.npz），预测时只需 svm_numpy，不导入 sklearn
+def export_numpy(model_name="svm_model.pkl", out_path=None):
     model, scaler = joblib.load(model_name)
-    feature = scaler.transform([feature])
-    return model.predict(feature)[0]
+    if not isinstance(model, SVC) or model.kernel != 'rbf':
+        raise ValueError(f"{model_name} 不是 RBF 核 SVC，无法导出（近似核引擎的模型请使用 joblib 格式）")
+    if model.break_ties:
+        raise ValueError("不支持 break_ties=True 的模型")
+    if model.gamma == 'scale':
+        # 训练时未固定 gamma 的旧模型：训练数据已标准化，方差按 1 计算，与 SVC 的预测可能有极小差异
+        print(f"{model_name} 的 gamma 为 'scale'，按标准化后的方差 1 近似计算；重新训练后可精确导出")
+    gamma = resolve_gamma(model)
+    out_path = out_path or os.path.splitext(model_name)[0] + '.npz'
+    np.savez(out_path,
+             mean=scaler.mean_, scale=scaler.scale_,
+             support_vectors=model.support_vectors_, dual_coef=model.dual_coef_,
+             intercept=model.intercept_, n_support=model.n_support_,
+             classes=model.classes_, gamma=gamma)
+    print(f"已导出 {out_path}（{len(model.support_vectors_)} 个支持向量）")
+    return out_path
+
+# 振动特征（经过特征缓存）：样本、提取函数源码与 EXTRACTOR_VERSION 不变时直接读取上次的结果
+def vibration_features_cached(vibration_data, use_cache=True):
+    if not use_cache:
+        return extract_vibration_features_batch(vibration_data)
+    from feature_cache import FeatureCache
+    from cnn_lstm_features import extractor_info
+    return FeatureCache().get_or_compute(extract_vibration_features_batch, vibration_data,
+                                         compute=lambda func, data: func(data),
+                                         version=extractor_info('vibration'))
+
+# 检查振动模型能否按诊断流程调用：单个原始信号 -> extract_vibration_features -> predict_svm
+def check_vibration_model(model_name="vibration_svm.pkl", signal=None):
+    signal = np.random.default_rng(0).standard_normal(1024) if signal is None else np.asarray(signal)
+    feature = extract_vibration_features(signal)
+    model, scaler = registry.get(model_name)
+    if scaler.n_features_in_ != len(feature):
+        raise ValueError(f"{model_name} 的输入为 {scaler.n_features_in_} 维，而诊断提取的振动特征为 {len(feature)} 维，"
+                         f"请用 svm.py 重新训练")
+    return predict_svm(feature, model_name)
 
 # 主函数
 def main():
-    acoustic_features, acoustic_labels = load_data('acoustic_data.txt')
-    vibration_features, vibration_labels = load_data('vibration_data.txt')
+    parser = argparse.ArgumentParser(description="训练声学与振动 SVM 模型")
+    parser.add_argument('--tune', action='store_true', help="交叉验证搜索 C 与 gamma（两个模型同时进行）")
+    parser.add_argument('--search', default='grid', choices=['grid', 'halving'])
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=None, help="并行进程总数，默认使用全部 CPU 核心")
+    parser.add_argument('--update', action='store_true', help="增量训练：用数据文件中的新样本更新已有模型")
+    parser.add_argument('--acoustic', default='acoustic_data.txt', help="声学数据（文本或 .dataset 目录）")
+    parser.add_argument('--vibration', default='vibration_data.txt', help="振动数据（文本或 .dataset 目录）")
+    parser.add_argument('--engine', default='exact', choices=['exact', 'nystroem', 'rff'],
+                        help="不调参时的训练引擎，样本很多时可用近似核")
+    parser.add_argument('--export', action='store_true', help="把已训练的模型导出为纯 NumPy 格式（.npz）")
+    parser.add_argument('--no-cache', action='store_true', help="不使用特征缓存")
+    args = parser.parse_args()
+
+    if args.export:
+        export_numpy("acoustic_svm.pkl")
+        export_numpy("vibration_svm.pkl")
+        return
+
+    acoustic_features, acoustic_labels = load_data(args.acoustic)
+    vibration_data, vibration_labels = load_data(args.vibration)
+    # 振动模型使用与诊断时相同的 24 维特征（统计量 + CWT 均值），而不是原始采样点
+    vibration_features = vibration_features_cached(vibration_data, use_cache=not args.no_cache)
+
+    if args.update:
+        update_svm(acoustic_features, acoustic_labels, "acoustic_svm.pkl")
+        update_svm(vibration_features, vibration_labels, "vibration_svm.pkl")
+    elif args.tune:
+        tune_all([(acoustic_features, acoustic_labels, "acoustic_svm.pkl"),
+                  (vibration_features, vibration_labels, "vibration_svm.pkl")],
+                 n_jobs=args.jobs, search=args.search, cv=args.cv)
+    else:
+        print("训练声学数据 SVM...")
+        train_svm(acoustic_features, acoustic_labels, "acoustic_svm.pkl", engine=args.engine)
 
-    print("训练声学数据 SVM...")
-    train_svm(acoustic_features, acoustic_labels, "acoustic_svm.pkl")
+        print("训练振动数据 SVM...")
+        train_svm(vibration_features, vibration_labels, "vibration_svm.pkl", engine=args.engine)
 
-    print("训练振动数据 SVM...")
-    train_svm(vibration_features, vibration_labels, "vibration_svm.pkl")
+    check_vibration_model("vibration_svm.pkl", vibration_data[0])
 
 if __name__ == "__main__":
     main()
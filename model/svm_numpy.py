@@ -0,0 +1,119 @@
+import os
+import numpy as np
+from model_registry import ModelRegistry
+
+# 纯 NumPy 的 RBF SVM 预测（模型由 svm.export_numpy 导出为 .npz），服务进程不需要导入 sklearn：
+#   mean / scale        StandardScaler 参数
+#   support_vectors     支持向量 (n_sv, n_features)，按类别依次排列
+#   dual_coef           对偶系数 (n_classes - 1, n_sv)
+#   intercept           截距 (n_classes * (n_classes - 1) / 2,)
+#   n_support           每个类别的支持向量数
+#   classes / gamma
+#
+# 两类：决策值 = K @ dual_coef[0] + intercept[0]，大于 0 判为 classes[1]；
+# 多类：与 libsvm 相同的一对一投票，类别对 (i, j) 的决策值大于 0 投给 i，否则投给 j，平票取编号小的类别。
+# 结果与 SVC.predict 一致（核矩阵用 float32 计算，决策值极接近 0 的样本可能不同）。
+# 各类别得分与 SVC.decision_function（默认 decision_function_shape='ovr'）相同：票数加上缩放到 (-1/3, 1/3) 的决策值之和。
+
+KERNEL_BYTES = 32 * 2 ** 20
+
+
+class NumpySVM:
+    def __init__(self, path):
+        with np.load(path) as params:
+            self.mean = params['mean'].astype(np.float32)
+            self.scale = params['scale'].astype(np.float32)
+            self.support_vectors = params['support_vectors'].astype(np.float32)
+            self.dual_coef = params['dual_coef'].astype(np.float32)
+            self.intercept = params['intercept'].astype(np.float32)
+            self.n_support = params['n_support']
+            self.classes = params['classes']
+            self.gamma = np.float32(params['gamma'])
+        self._sv_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        self._starts = np.concatenate([[0], np.cumsum(self.n_support)])
+
+    def kernel(self, X):
+        """ RBF 核矩阵 exp(-gamma * |x - sv|^2)，X 为已标准化的 float32 样本 (n, n_features) """
+        dist = X @ self.support_vectors.T
+        dist *= -2
+        dist += np.einsum('ij,ij->i', X, X)[:, None]
+        dist += self._sv_norms
+        np.maximum(dist, 0, out=dist)
+        dist *= -self.gamma
+        return np.exp(dist, out=dist)
+
+    def decision_function(self, X):
+        """ 各类别对的决策值 (n, n_pairs)，顺序与 SVC.decision_function(decision_function_shape='ovo') 相同 """
+        K = self.kernel(X)
+        n_classes = len(self.classes)
+        if n_classes == 2:
+            return (K @ self.dual_coef[0] + self.intercept[0])[:, None]
+
+        dec = np.empty((len(X), len(self.intercept)), dtype=np.float32)
+        p = 0
+        for i in range(n_classes):
+            si = slice(self._starts[i], self._starts[i + 1])
+            for j in range(i + 1, n_classes):
+                sj = slice(self._starts[j], self._starts[j + 1])
+                dec[:, p] = K[:, si] @ self.dual_coef[j - 1, si] + K[:, sj] @ self.dual_coef[i, sj] + self.intercept[p]
+                p += 1
+        return dec
+
+    def predict(self, features_2d):
+        """ 批量预测，features_2d 为未标准化的特征 (n_samples, n_features) """
+        return self.predict_scores(features_2d)[0]
+
+    def predict_scores(self, features_2d):
+        """ 批量预测，返回 (类别, 各类别得分)；两类时得分为单列决策值 (n_samples, 1) """
+        X = np.asarray(features_2d, dtype=np.float32)
+        X = (X - self.mean) / self.scale
+        n_classes = len(self.classes)
+        result = np.empty(len(X), dtype=self.classes.dtype)
+        scores = np.empty((len(X), 1 if n_classes == 2 else n_classes), dtype=np.float32)
+        # 分块计算，核矩阵不超过 KERNEL_BYTES
+        step = max(1, KERNEL_BYTES // (4 * max(1, len(self.support_vectors))))
+        for start in range(0, len(X), step):
+            dec = self.decision_function(X[start:start + step])
+            if n_classes == 2:
+                result[start:start + len(dec)] = self.classes[(dec[:, 0] > 0).astype(int)]
+                scores[start:start + len(dec)] = dec
+                continue
+            votes = np.zeros((len(dec), n_classes), dtype=np.int32)
+            confidence = np.zeros((len(dec), n_classes), dtype=np.float32)
+            rows = np.arange(len(dec))
+            p = 0
+            for i in range(n_classes):
+                for j in range(i + 1, n_classes):
+                    votes[rows, np.where(dec[:, p] > 0, i, j)] += 1
+                    confidence[:, i] += dec[:, p]
+                    confidence[:, j] -= dec[:, p]
+                    p += 1
+            result[start:start + len(dec)] = self.classes[np.argmax(votes, axis=1)]
+            scores[start:start + len(dec)] = votes + confidence / (3 * (np.abs(confidence) + 1))
+        return result, scores
+
+
+# 常驻注册表：.npz 只加载一次，重新导出后自动重新加载
+registry = ModelRegistry(loader=NumpySVM)
+
+
+def predict_svm(feature, model_name="svm_model.npz"):
+    return predict_many([feature], model_name)[0]
+
+
+def predict_many(features_2d, model_name="svm_model.npz"):
+    return registry.get(model_name).predict(features_2d)
+
+
+def predict_scores(features_2d, model_name="svm_model.npz"):
+    return registry.get(model_name).predict_scores(features_2d)
+
+
+def model_path(model_name):
+    """ 优先使用导出的 .npz 模型（同名、不旧于 .pkl），否则返回原路径 """
+    stem, ext = os.path.splitext(model_name)
+    path = stem + '.npz'
+    if ext != '.npz' and os.path.exists(path) and (not os.path.exists(model_name)
+                                                   or os.path.getmtime(path) >= os.path.getmtime(model_name)):
+        return path
+    return model_name
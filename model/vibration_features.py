@@ -0,0 +1,41 @@
+import numpy as np
+import fast_cwt
+
+# 振动特征（统计量 + CWT 均值，共 24 维），只依赖 NumPy 与 fast_cwt，
+# 诊断服务与 GUI 可以不导入 svm（及 sklearn）直接提取特征。
+
+# 振动数据特征提取
+def extract_vibration_features(vibration_data):
+    mean_val = np.mean(vibration_data)
+    std_val = np.std(vibration_data)
+    skew_val = np.mean((vibration_data - mean_val) ** 3) / std_val ** 3
+    kurt_val = np.mean((vibration_data - mean_val) ** 4) / std_val ** 4
+
+    coeffs, _ = fast_cwt.cwt(vibration_data, scales=np.arange(1, 21), wavelet='morl')
+    cwt_mean = np.mean(coeffs, axis=1)
+
+    return np.hstack([mean_val, std_val, skew_val, kurt_val, cwt_mean])
+
+# 振动数据批量特征提取：输入 (n_samples, n_points)，返回 (n_samples, 24)
+# CWT 均值是信号的线性函数，整批样本只需一次矩阵乘法（见 fast_cwt.cwt_mean_weights）
+def extract_vibration_features_batch(vibration_data, chunk_rows=4096):
+    vibration_data = np.asarray(vibration_data)
+    n_samples, n_points = vibration_data.shape
+    weights = fast_cwt.cwt_mean_weights(n_points, tuple(range(1, 21)), 'morl')
+
+    features = np.empty((n_samples, 4 + weights.shape[1]))
+    # 分块处理，内存映射的大数据集也只占用 chunk_rows 行的内存
+    for start in range(0, n_samples, chunk_rows):
+        block = np.asarray(vibration_data[start:start + chunk_rows], dtype=np.float64)
+        out = features[start:start + len(block)]
+
+        mean_val = np.mean(block, axis=1)
+        std_val = np.std(block, axis=1)
+        centered = block - mean_val[:, None]
+        squared = centered * centered
+        out[:, 0] = mean_val
+        out[:, 1] = std_val
+        out[:, 2] = np.mean(squared * centered, axis=1) / std_val ** 3
+        out[:, 3] = np.mean(squared * squared, axis=1) / std_val ** 4
+        out[:, 4:] = block @ weights
+    return features
@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model'))
+
+# 训练（内存 / 流式）、推理会话与 TFLite 导出的模型输入形状必须一致：(batch, n_mels, n_frames, 1)
+#   python -m pytest -q tests
+
+tf = pytest.importorskip('tensorflow')
+joblib = pytest.importorskip('joblib')
+pytest.importorskip('sklearn')
+
+import cnn_lstm_data  # noqa: E402
+import cnn_lstm_features as features  # noqa: E402
+from cnn_lstm_train import build_cnn_lstm  # noqa: E402
+
+N_CLASSES = 3
+
+
+def _scaler(feats):
+    from sklearn.preprocessing import StandardScaler
+    return StandardScaler().fit(feats.reshape(len(feats), -1))
+
+
+@pytest.fixture
+def store(tmp_path):
+    """ 手工写入一个两分片的小特征库（声学特征 (n_mels, n_frames) = (16, 12)） """
+    rng = np.random.default_rng(0)
+    n_samples, shard_rows = 10, 6
+    acoustic = rng.standard_normal((n_samples, 16, 12)).astype(np.float32)
+    vibration = rng.standard_normal((n_samples, 4, 8)).astype(np.float32)
+    labels = rng.integers(0, N_CLASSES, n_samples)
+    n_shards = (n_samples + shard_rows - 1) // shard_rows
+    for shard in range(n_shards):
+        rows = slice(shard * shard_rows, (shard + 1) * shard_rows)
+        for kind, data in (('acoustic', acoustic), ('vibration', vibration), ('labels', labels)):
+            np.save(cnn_lstm_data._shard_path(str(tmp_path), kind, shard), data[rows])
+    meta = {'version': cnn_lstm_data.STORE_VERSION, 'n_samples': n_samples, 'shard_rows': shard_rows,
+            'n_shards': n_shards, 'shapes': {'acoustic': [16, 12], 'vibration': [4, 8]}}
+    with open(tmp_path / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    return cnn_lstm_data.open_store(str(tmp_path)), _scaler(acoustic)
+
+
+def test_streaming_dataset_matches_model(store):
+    meta, scaler = store
+    dataset = cnn_lstm_data.make_dataset(meta, scaler, N_CLASSES, batch_size=4, shuffle=False)
+    x_spec, y_spec = dataset.element_spec
+    assert x_spec.shape.as_list() == [None, *meta['shapes']['acoustic'], 1]
+
+    # train_streaming 的建模方式
+    model = build_cnn_lstm((*meta['shapes']['acoustic'], 1), N_CLASSES)
+    assert tuple(model.compute_output_shape(tuple(x_spec.shape))) == tuple(y_spec.shape)
+    model.compile(optimizer='adam', loss='categorical_crossentropy')
+    model.fit(dataset, epochs=1, verbose=0)
+
+
+def test_sessions_match_model(tmp_path):
+    from cnn_lstm_infer import InferenceSession
+    from cnn_lstm_lite import LiteSession
+    from cnn_lstm_export import export_tflite
+
+    n_mels = 32
+    audio = np.random.default_rng(1).standard_normal((5, 4000)).astype(np.float32)
+    feats = features.extract_acoustic_features_batch(audio, sr=16000, n_mels=n_mels)
+    scaler = _scaler(feats)
+    model_path, scaler_path = str(tmp_path / 'model.h5'), str(tmp_path / 'scalers.pkl')
+    # train 的建模方式：特征加通道轴后的单个样本形状
+    build_cnn_lstm(feats[..., np.newaxis].shape[1:], N_CLASSES).save(model_path)
+    joblib.dump((scaler, scaler), scaler_path)
+
+    session = InferenceSession(model_path, scaler_path, n_mels=n_mels)
+    proba = session.predict_proba(audio)
+    assert proba.shape == (len(audio), N_CLASSES)
+
+    # 固定批大小 2，5 个样本需要补零分块
+    lite_path, lite_scaler_path = str(tmp_path / 'model.tflite'), str(tmp_path / 'model.scaler.npz')
+    export_tflite(model_path, scaler_path, lite_path, lite_scaler_path, n_mels=n_mels, batch_size=2)
+    lite = LiteSession(lite_path, lite_scaler_path, num_threads=1)
+    assert lite.batch_size == 2
+    np.testing.assert_allclose(lite.predict_proba(audio), proba, atol=1e-4)